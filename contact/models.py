@@ -1,7 +1,7 @@
 from django.db import models
-from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
-from django.utils.translation import activate
+
+from links.urlbuilder import url_builder
 
 
 class ContactUs(models.Model):
@@ -30,5 +30,5 @@ class ContactUs(models.Model):
 
     def get_admin_url(self):
         model_name = self.__class__.__name__.lower()
-        activate('en')
-        return reverse(f"admin:contact_{model_name}_change", args=(self.id,))
+        return url_builder.build(f'admin:contact_{model_name}_change',
+            self.id, language='en')
@@ -1,11 +1,11 @@
 from django.utils.translation import ugettext_lazy as _
-from django.contrib.contenttypes.models import ContentType
 from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.contrib import messages
 from .models import ContactUs
 from .forms import ContactUsForm
 from dashboard.models import Action
+from links.registry import content_types
 
 
 # contact us
@@ -19,8 +19,7 @@ def contact_us(request):
 
             # create action
             model_name = ContactUs.__name__.lower()
-            content_type = ContentType.objects.get(model=model_name,
-                app_label='contact')
+            content_type = content_types.get_content_type(model_name)
             Action.objects.get_or_create(type='contact_us',
                 content_type=content_type, object_id=obj.id)
 
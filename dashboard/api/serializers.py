@@ -10,6 +10,7 @@ User = get_user_model()
 class WebsiteSerializer(serializers.ModelSerializer):
     detail_url = utils.WEBSITE_DETAIL_URL
     thumbnail = serializers.SerializerMethodField()
+    thumbnails = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Website
@@ -17,6 +18,11 @@ class WebsiteSerializer(serializers.ModelSerializer):
             'title',
             'detail_url',
             'thumbnail',
+            'thumbnails',
+            'image_width',
+            'image_height',
+            'image_color',
+            'image_placeholder',
             'created',
             'updated',
             'status',
@@ -29,6 +35,7 @@ class WebsiteSerializer(serializers.ModelSerializer):
 class ChannelSerializer(serializers.ModelSerializer):
     detail_url = utils.CHANNEL_DETAIL_URL
     thumbnail = serializers.SerializerMethodField()
+    thumbnails = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Channel
@@ -36,6 +43,11 @@ class ChannelSerializer(serializers.ModelSerializer):
             'title',
             'detail_url',
             'thumbnail',
+            'thumbnails',
+            'image_width',
+            'image_height',
+            'image_color',
+            'image_placeholder',
             'created',
             'updated',
             'status',
@@ -48,6 +60,7 @@ class ChannelSerializer(serializers.ModelSerializer):
 class GroupSerializer(serializers.ModelSerializer):
     detail_url = utils.GROUP_DETAIL_URL
     thumbnail = serializers.SerializerMethodField()
+    thumbnails = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Group
@@ -55,6 +68,11 @@ class GroupSerializer(serializers.ModelSerializer):
             'title',
             'detail_url',
             'thumbnail',
+            'thumbnails',
+            'image_width',
+            'image_height',
+            'image_color',
+            'image_placeholder',
             'created',
             'updated',
             'status',
@@ -68,6 +86,7 @@ class GroupSerializer(serializers.ModelSerializer):
 class InstagramSerializer(serializers.ModelSerializer):
     detail_url = utils.INSTAGRAM_DETAIL_URL
     thumbnail = serializers.SerializerMethodField()
+    thumbnails = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Instagram
@@ -75,6 +94,11 @@ class InstagramSerializer(serializers.ModelSerializer):
             'title',
             'detail_url',
             'thumbnail',
+            'thumbnails',
+            'image_width',
+            'image_height',
+            'image_color',
+            'image_placeholder',
             'created',
             'updated',
             'status',
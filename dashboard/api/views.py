@@ -1,7 +1,8 @@
-from itertools import chain
-
 from django.contrib.auth import get_user_model
+from django.utils.translation import ugettext_lazy as _
 from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.generics import CreateAPIView, UpdateAPIView
 from rest_framework.views import APIView
 from rest_framework.generics import GenericAPIView
@@ -34,30 +35,51 @@ from dashboard.mixins import (
 	ReplaceChildWithParentMixIn,
 )
 
-from links.mixins import PaginateMixIn
-
 #from dashboard import utils
-from links.api.pagination import (
-	LinkLimitOffsetPagination,
-	LinkPageNumberPagination,
-)
+from links.api.pagination import LinkPageNumberPagination
 from dashboard import utils
 
 
 User = get_user_model()
 
 
-class LinkListAPIView(PaginateMixIn, GenericAPIView):
+class LinkListAPIView(GenericAPIView):
 	"""
-	List and paginate all user's links
+	List and paginate all user's links, latest updated first.
+	Clients opt in to cursor pagination (latest created first) by sending
+	`cursor` query parameter (empty for the first page), pages are linked
+	by an opaque cursor (see `next` in response).
 	"""
 	pagination_class = LinkPageNumberPagination
+	cursor_page_size = 20
 
-	def get_queryset(self):
+	def get(self, request, *args, **kwargs):
 		user = self.request.user
-		sorted_links = utils.get_sorted_users_links(user)
+		if 'cursor' not in request.query_params:
+			links = self.paginate_queryset(utils.get_users_links(user))
+			return self.get_paginated_response(self.serialize(links))
+
+		cursor = request.query_params['cursor']
+		try:
+			links, next_cursor = utils.get_users_links_page(user,
+				self.cursor_page_size, cursor)
+		except ValueError:
+			raise NotFound(_('Invalid cursor'))
+
+		next_url = None
+		if next_cursor:
+			next_url = replace_query_param(request.build_absolute_uri(),
+				'cursor', next_cursor)
+
+		result = {
+			'next': next_url,
+			'results': self.serialize(links),
+		}
+		return Response(result)
+
+	def serialize(self, links):
 		# if links have child, sent their child instead of them.
-		links_and_children = utils.replace_child_with_parent(sorted_links)
+		links_and_children = utils.replace_child_with_parent(links)
 
 		users_links = []
 		for link in links_and_children:
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from dashboard.models import (
+    Counter,
+    User,
+    UserStatistics,
+    UNREAD_ACTIONS,
+    count_unread_actions,
+)
+
+
+class Command(BaseCommand):
+    help = 'Recount links of users and unread actions, fix counters drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+            help='Number of users recounted in each transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        user_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+        last_id = 0
+        fixed = 0
+        while True:
+            batch = list(user_ids.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                fixed += UserStatistics.objects.recompute(batch)
+            last_id = batch[-1]
+        self.stdout.write(f'User statistics: {fixed} fixed')
+
+        with transaction.atomic():
+            old_value = Counter.objects.filter(name=UNREAD_ACTIONS) \
+                .values_list('value', flat=True).first()
+            value = count_unread_actions()
+            Counter.objects.set_value(UNREAD_ACTIONS, value)
+        self.stdout.write(f'Unread actions: {old_value} -> {value}')
+        self.stdout.write(self.style.SUCCESS('Statistics repaired'))
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserStatistics',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('websites_count', models.IntegerField(default=0)),
+                ('channels_count', models.IntegerField(default=0)),
+                ('groups_count', models.IntegerField(default=0)),
+                ('instagrams_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'user statistics',
+            },
+        ),
+    ]
@@ -1,10 +1,12 @@
 import re
 
-from django.db import models
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import Count, F
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -41,6 +43,122 @@ def create_user_token(sender, instance, created, **kwargs):
         Token.objects.create(user=instance)
 
 
+class UserStatisticsManager(models.Manager):
+    def increment(self, user_id, field, delta=1):
+        """
+        Add `delta` to a counter of the user, missing statistics are
+        counted from scratch when they are read.
+        """
+        self.filter(user_id=user_id).update(**{field: F(field) + delta})
+
+    def get_for_user(self, user):
+        try:
+            return self.get(user=user)
+        except self.model.DoesNotExist:
+            self.recompute([user.pk])
+            return self.get(user=user)
+
+    def recompute(self, user_ids):
+        """
+        Count links of the given users again and fix their statistics,
+        return number of statistics that were missing or wrong.
+        """
+        counts = {user_id: dict.fromkeys(self.model.COUNTED_MODELS, 0)
+            for user_id in user_ids}
+        for field, model_name in self.model.COUNTED_MODELS.items():
+            model = apps.get_model(model_name)
+            rows = (model.objects
+                .filter(author__in=user_ids, parent=None)
+                .values_list('author')
+                .annotate(Count('id'))
+                .order_by())
+            for user_id, count in rows:
+                counts[user_id][field] = count
+
+        existing = {statistics.user_id: statistics
+            for statistics in self.filter(user__in=user_ids)}
+        fixed = 0
+        for user_id, values in counts.items():
+            statistics = existing.get(user_id)
+            if statistics is None:
+                self.create(user_id=user_id, **values)
+            elif any(getattr(statistics, field) != value
+                     for field, value in values.items()):
+                self.filter(user_id=user_id).update(**values)
+            else:
+                continue
+            fixed += 1
+        return fixed
+
+
+class UserStatistics(models.Model):
+    """
+    Number of (parent) links of each user, kept up to date when links are
+    created or deleted so they are not counted on every page.
+    """
+    # counter field -> counted model
+    COUNTED_MODELS = {
+        'websites_count': 'links.Website',
+        'channels_count': 'links.Channel',
+        'groups_count': 'links.Group',
+        'instagrams_count': 'links.Instagram',
+    }
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE,
+        primary_key=True, related_name='statistics')
+    websites_count = models.IntegerField(default=0)
+    channels_count = models.IntegerField(default=0)
+    groups_count = models.IntegerField(default=0)
+    instagrams_count = models.IntegerField(default=0)
+
+    # Managers
+    objects = UserStatisticsManager()
+
+    class Meta:
+        verbose_name_plural = _('user statistics')
+
+    def __str__(self):
+        return f'{self.user}'
+
+
+@receiver(post_save, sender=User)
+def create_user_statistics(sender, instance, created, **kwargs):
+    if created:
+        UserStatistics.objects.create(user=instance)
+
+
+class CounterManager(models.Manager):
+    def increment(self, name, delta=1):
+        """
+        Add `delta` to the counter, missing counters are counted from
+        scratch when they are read.
+        """
+        self.filter(name=name).update(value=F('value') + delta)
+
+    def get_value(self, name, count):
+        """Value of the counter, `count()` is used if it's missing"""
+        value = self.filter(name=name).values_list('value', flat=True).first()
+        if value is None:
+            value = count()
+            self.set_value(name, value)
+        return value
+
+    def set_value(self, name, value):
+        self.update_or_create(name=name, defaults={'value': value})
+
+
+class Counter(models.Model):
+    """Site-wide counters, eg. number of unread actions"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.IntegerField(default=0)
+
+    # Managers
+    objects = CounterManager()
+
+    def __str__(self):
+        return f'{self.name}: {self.value}'
+
+
 class Action(models.Model):
     TYPES_OF_ACTIONS = (
         ('link created', _('Link Created')),
@@ -69,6 +187,48 @@ class Action(models.Model):
     def __str__(self):
         return f'{smart_text(self.content_object)}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # saved value, to know how unread actions counter changes
+        instance._loaded_is_read = instance.__dict__.get('is_read')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # unread actions counter is updated in the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def get_admin_url(self):
         model_name = self.__class__.__name__.lower()
         return reverse(f"admin:dashboard_{model_name}_change", args=(self.id,))
+
+
+UNREAD_ACTIONS = 'unread actions'
+
+
+def count_unread_actions():
+    return Action.objects.filter(is_read=False).count()
+
+
+def get_unread_actions_count():
+    return Counter.objects.get_value(UNREAD_ACTIONS, count_unread_actions)
+
+
+@receiver(post_save, sender=Action)
+def update_unread_actions_count(sender, instance, created, **kwargs):
+    if created:
+        was_unread = False
+    else:
+        was_unread = getattr(instance, '_loaded_is_read',
+            instance.is_read) is False
+    delta = int(not instance.is_read) - int(was_unread)
+    if delta:
+        Counter.objects.increment(UNREAD_ACTIONS, delta)
+    instance._loaded_is_read = instance.is_read
+
+
+@receiver(post_delete, sender=Action)
+def decrement_unread_actions_count(sender, instance, **kwargs):
+    if getattr(instance, '_loaded_is_read', instance.is_read) is False:
+        Counter.objects.increment(UNREAD_ACTIONS, -1)
@@ -1,3 +1,200 @@
+import io
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+
+from dashboard.api.views import LinkListAPIView
+from dashboard.models import (
+    Action,
+    Counter,
+    UserStatistics,
+    UNREAD_ACTIONS,
+    get_unread_actions_count,
+)
+from links import utils
+from links.models import Channel, Website
+from links.tests import create_link, use_temp_media_root
+
+
+class LinkListAPITests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        self.user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        self.client.force_login(self.user)
+        self.links = [create_link(Website, self.user, number)
+            for number in range(0, 12, 2)]
+        self.links += [create_link(Channel, self.user, number)
+            for number in range(1, 12, 2)]
+        self.url = reverse('dashboard-api:index')
+
+    def get_titles(self, response):
+        return [link['title'] for link in response.data['results']]
+
+    def get_all_pages(self, **params):
+        response = self.client.get(self.url, params)
+        titles = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            titles += self.get_titles(response)
+            if response.data['next'] is None:
+                return titles
+            response = self.client.get(response.data['next'])
+
+    def test_page_number_pagination(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data),
+            {'count', 'next', 'previous', 'results'})
+        self.assertEqual(response.data['count'], 12)
+        # latest updated first
+        self.assertEqual(self.get_titles(response)[0], 'Channel 11')
+
+    @mock.patch.object(LinkListAPIView, 'cursor_page_size', 5)
+    def test_cursor_pagination(self):
+        self.assertEqual(self.get_all_pages(cursor=''),
+            [link.title for link in sorted(self.links,
+                key=lambda link: link.created, reverse=True)])
+
+    @mock.patch.object(LinkListAPIView, 'cursor_page_size', 5)
+    def test_links_updated_while_paging_are_listed_once(self):
+        response = self.client.get(self.url, {'cursor': ''})
+        titles = self.get_titles(response)
+        # a link of the next page and a listed link are edited
+        for title in ('Channel 5', 'Website 10'):
+            link = next(link for link in self.links if link.title == title)
+            link.description = 'edited'
+            link.save()
+        response = self.client.get(response.data['next'])
+        titles += self.get_titles(response)
+        response = self.client.get(response.data['next'])
+        titles += self.get_titles(response)
+        self.assertEqual(len(titles), len(set(titles)))
+        self.assertEqual(len(titles), 12)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'zzz'})
+        self.assertEqual(response.status_code, 404)
+
+
+class IndexTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        self.user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        self.client.force_login(self.user)
+        self.links = [create_link(Website, self.user, number)
+            for number in range(0, 12, 2)]
+        self.links += [create_link(Channel, self.user, number)
+            for number in range(1, 12, 2)]
+        self.url = reverse('dashboard:index')
+
+    def get_titles(self, response):
+        return [link.title for link in response.context['links']]
+
+    def test_page_number_pagination(self):
+        # an older link is edited, it is listed first
+        self.links[0].description = 'edited'
+        self.links[0].save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['is_paginated'])
+        self.assertEqual(response.context['links'].paginator.num_pages, 2)
+        self.assertEqual(self.get_titles(response)[:2],
+            ['Website 0', 'Channel 11'])
+        response = self.client.get(self.url, {'page': 2})
+        self.assertEqual(len(self.get_titles(response)), 2)
+
+    def test_cursor_pagination(self):
+        response = self.client.get(self.url, {'cursor': ''})
+        titles = self.get_titles(response)
+        self.assertNotIn('is_paginated', response.context)
+        response = self.client.get(self.url,
+            {'cursor': response.context['next_cursor']})
+        titles += self.get_titles(response)
+        self.assertIsNone(response.context['next_cursor'])
+        self.assertEqual(titles, [link.title for link in sorted(self.links,
+            key=lambda link: link.created, reverse=True)])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'zzz'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['cursor'])
+        self.assertEqual(self.get_titles(response)[0], 'Channel 11')
+
+
+class StatisticsTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        self.user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        self.other = get_user_model().objects.create_user('other',
+            'other@example.com', 'password')
+
+    def get_counts(self, user):
+        statistics = UserStatistics.objects.get(user=user)
+        return statistics.websites_count, statistics.channels_count
+
+    def test_links_are_counted(self):
+        website = create_link(Website, self.user, 1)
+        create_link(Channel, self.user, 2, status='draft')
+        self.assertEqual(self.get_counts(self.user), (1, 1))
+
+        # drafts and published links are counted, children are not
+        website.status = 'draft'
+        website.save()
+        self.assertTrue(utils.validate_and_update_link(website,
+            {'title': 'edited'}))
+        child = website.child
+        child.status = 'published'
+        child.save()
+        self.assertEqual(self.get_counts(self.user), (1, 1))
+
+        website = Website.objects.get(pk=website.pk)
+        website.author = self.other
+        website.save()
+        self.assertEqual(self.get_counts(self.user), (0, 1))
+        self.assertEqual(self.get_counts(self.other), (1, 0))
+
+        child.delete()
+        website.delete()
+        self.assertEqual(self.get_counts(self.other), (0, 0))
+
+    def test_unread_actions_are_counted(self):
+        website = create_link(Website, self.user, 1)
+        channel = create_link(Channel, self.user, 2)
+        utils.create_or_update_action(website, 'link created')
+        utils.create_or_update_action(channel, 'link created')
+        self.assertEqual(get_unread_actions_count(), 2)
+
+        action = Action.objects.get(object_id=website.pk,
+            content_type__model='website')
+        utils.hide_action(action)
+        self.assertEqual(get_unread_actions_count(), 1)
+        utils.create_or_update_action(website, 'link created')
+        self.assertEqual(get_unread_actions_count(), 2)
+        Action.objects.get(pk=action.pk).delete()
+        self.assertEqual(get_unread_actions_count(), 1)
+
+    def test_repair_statistics(self):
+        create_link(Website, self.user, 1)
+        utils.create_or_update_action(Website.objects.get(), 'link created')
+        UserStatistics.objects.filter(user=self.user).update(
+            websites_count=5)
+        UserStatistics.objects.filter(user=self.other).delete()
+        Counter.objects.set_value(UNREAD_ACTIONS, 7)
+
+        output = io.StringIO()
+        call_command('repair_statistics', stdout=output)
+        self.assertIn('User statistics: 2 fixed', output.getvalue())
+        self.assertIn('Unread actions: 7 -> 1', output.getvalue())
+        self.assertEqual(self.get_counts(self.user), (1, 0))
+        self.assertEqual(self.get_counts(self.other), (0, 0))
+        self.assertEqual(get_unread_actions_count(), 1)
 
-# Create your tests here.
+        output = io.StringIO()
+        call_command('repair_statistics', stdout=output)
+        self.assertIn('User statistics: 0 fixed', output.getvalue())
@@ -1,17 +1,29 @@
-from itertools import chain
 from links.models import Website, Channel, Group, Instagram
+from links.pagination import MergePaginator, MergedQuerySets
 
 
-def get_sorted_users_links(user):
-    websites = Website.objects.filter(author=user, parent=None)
-    channels = Channel.objects.filter(author=user, parent=None)
-    groups = Group.objects.filter(author=user, parent=None)
-    instagrams = Instagram.objects.filter(author=user, parent=None)
+def get_users_querysets(user):
+    return [model.objects.filter(author=user, parent=None)
+        for model in (Website, Channel, Group, Instagram)]
 
-    sorted_links = sorted(chain(websites, channels, groups, instagrams),
-        key=lambda link: link.updated, reverse=True)
 
-    return sorted_links
+def get_users_links(user):
+    """
+    Return user's links sorted by `updated` (latest first), to be
+    paginated by page number.
+    """
+    return MergedQuerySets(get_users_querysets(user), field='updated')
+
+
+def get_users_links_page(user, per_page, cursor=None):
+    """
+    Return a page of user's links, sorted by `created` (latest first, it
+    never changes so links are not skipped or repeated while paging), and
+    the cursor of the next page.
+    Raise ValueError if cursor is invalid.
+    """
+    paginator = MergePaginator(get_users_querysets(user), per_page)
+    return paginator.page(cursor)
 
 
 def replace_child_with_parent(links: list):
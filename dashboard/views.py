@@ -43,19 +43,33 @@ def get_paginated_object_list(request, queryset, num):
 @login_required
 def index(request):
     user = request.user
-    sorted_links = utils.get_sorted_users_links(user)
-    # if links have child, sent their child instead of them.
-    links_and_children = utils.replace_child_with_parent(sorted_links)
-
-    object_list, page = get_paginated_object_list(request,
-                                        links_and_children, 10)
-
-    context = {
-        'links': object_list,
-        'page': page,
-        'is_paginated': True,
-        'active_dashboard': True,
-    }
+    context = {'active_dashboard': True}
+    if 'cursor' in request.GET:
+        # opt-in cursor pages, sorted by `created`
+        cursor = request.GET.get('cursor') or None
+        try:
+            links, next_cursor = utils.get_users_links_page(user, 10, cursor)
+        except ValueError:
+            # invalid cursor, show the first page
+            cursor = None
+            links, next_cursor = utils.get_users_links_page(user, 10)
+        # if links have child, sent their child instead of them.
+        context.update({
+            'links': utils.replace_child_with_parent(links),
+            'cursor': cursor,
+            'next_cursor': next_cursor,
+        })
+    else:
+        object_list, page = get_paginated_object_list(request,
+            utils.get_users_links(user), 10)
+        # if links have child, sent their child instead of them.
+        object_list.object_list = utils.replace_child_with_parent(
+            object_list.object_list)
+        context.update({
+            'links': object_list,
+            'page': page,
+            'is_paginated': True,
+        })
     return render(request, 'dashboard/index.html', context)
 
 
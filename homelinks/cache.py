@@ -0,0 +1,206 @@
+import os
+import pickle
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+
+
+# value written by `TwoTierCache.set`, stamp is a random id of the write
+Stamped = namedtuple('Stamped', ['stamp', 'value'])
+# shared key of processes that published their statistics, and prefix of
+# their statistics keys
+STATS_KEY = 'two-tier-cache:stats'
+
+
+class TwoTierCache(BaseCache):
+    """
+    Cache backend with a small in-process LRU cache in front of a shared
+    cache, LOCATION is the alias of the shared cache.
+
+    Values are stored in the shared cache with a stamp. A value found in
+    the local cache is used for LOCAL_TIMEOUT seconds, after that only its
+    stamp is read from the shared cache to know whether another process
+    changed or deleted it. So changes made by other processes are seen
+    after LOCAL_TIMEOUT seconds at most.
+
+    Values written by `add`, `incr` and `decr` (locks, counters, versions)
+    are never kept locally. Counters must be created by `add`, values
+    written by `set` are stamped and can not be incremented.
+
+    Each process publishes its hits and misses to the shared cache every
+    STATS_INTERVAL seconds, `cache_stats` command shows them.
+
+    OPTIONS:
+        LOCAL_MAX_ENTRIES: size of the local cache (default 1000)
+        LOCAL_TIMEOUT: seconds before a local value is checked (default 5)
+        LOCAL_KEY_PREFIXES: only these keys are kept locally (default all)
+        STATS_INTERVAL: seconds between publishing statistics (default 60)
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = location
+        self.local_max_entries = int(options.get('LOCAL_MAX_ENTRIES', 1000))
+        self.local_timeout = float(options.get('LOCAL_TIMEOUT', 5))
+        self.local_key_prefixes = tuple(options.get('LOCAL_KEY_PREFIXES', ('',)))
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ('local_hits', 'local_misses', 'shared_hits', 'shared_misses'), 0)
+        self.stats_interval = float(options.get('STATS_INTERVAL', 60))
+        self._stats_published_at = 0
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    @staticmethod
+    def get_stamp_key(key):
+        return f'{key}:stamp'
+
+    def is_local(self, key):
+        return key.startswith(self.local_key_prefixes)
+
+    def count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+            now = time.time()
+            publish = now >= self._stats_published_at + self.stats_interval
+            if publish:
+                self._stats_published_at = now
+        if publish:
+            self.publish_stats()
+
+    def get_stats(self):
+        """Hits and misses of each tier in this process"""
+        with self._lock:
+            return dict(self._stats, local_entries=len(self._local))
+
+    def publish_stats(self):
+        """Write statistics of this process to the shared cache"""
+        process = f'{socket.gethostname()}:{os.getpid()}'
+        # statistics of stopped processes expire
+        self.shared.set(f'{STATS_KEY}:{process}', self.get_stats(),
+            max(self.stats_interval * 3, 60))
+        processes = self.get_all_stats()
+        if process not in processes:
+            # a concurrent publish may drop a process, it is added again
+            # by its next publish
+            self.shared.set(STATS_KEY, list(processes) + [process], None)
+
+    def get_all_stats(self):
+        """Published statistics of each running process by host:pid"""
+        processes = self.shared.get(STATS_KEY) or []
+        stats = self.shared.get_many(
+            [f'{STATS_KEY}:{process}' for process in processes])
+        prefix = f'{STATS_KEY}:'
+        return {key[len(prefix):]: value for key, value in stats.items()}
+
+    # local tier
+    def get_local(self, local_key):
+        with self._lock:
+            entry = self._local.get(local_key)
+            if entry is not None:
+                self._local.move_to_end(local_key)
+            return entry
+
+    def set_local(self, local_key, value, stamp, timeout=DEFAULT_TIMEOUT):
+        check_at = time.time() + self.local_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            check_at = min(check_at, time.time() + timeout)
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._local[local_key] = (pickled, stamp, check_at)
+            self._local.move_to_end(local_key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def renew_local(self, local_key, entry):
+        pickled, stamp, check_at = entry
+        with self._lock:
+            if local_key in self._local:
+                self._local[local_key] = (pickled, stamp,
+                    time.time() + self.local_timeout)
+
+    def delete_local(self, local_key):
+        with self._lock:
+            self._local.pop(local_key, None)
+
+    # cache API
+    def get(self, key, default=None, version=None):
+        local_key = self.make_key(key, version)
+        entry = self.get_local(local_key)
+        if entry is not None:
+            pickled, stamp, check_at = entry
+            if time.time() >= check_at:
+                shared_stamp = self.shared.get(self.get_stamp_key(key),
+                    version=version)
+                if shared_stamp == stamp:
+                    self.renew_local(local_key, entry)
+                else:
+                    # changed or deleted by another process
+                    self.delete_local(local_key)
+                    entry = None
+            if entry is not None:
+                self.count('local_hits')
+                return pickle.loads(pickled)
+        self.count('local_misses')
+
+        value = self.shared.get(key, version=version)
+        if value is None:
+            self.count('shared_misses')
+            return default
+        self.count('shared_hits')
+        if isinstance(value, Stamped):
+            if self.is_local(key):
+                self.set_local(local_key, value.value, value.stamp)
+            return value.value
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_key(key, version)
+        if not self.is_local(key):
+            self.delete_local(local_key)
+            self.shared.set(key, value, timeout, version=version)
+            return
+        stamp = uuid.uuid4().hex
+        self.shared.set_many({
+            key: Stamped(stamp, value),
+            self.get_stamp_key(key): stamp,
+        }, timeout, version=version)
+        self.set_local(local_key, value, stamp, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.delete_local(self.make_key(key, version))
+        return self.shared.add(key, value, timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.touch(self.get_stamp_key(key), timeout, version=version)
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.delete_local(self.make_key(key, version))
+        self.shared.delete_many([key, self.get_stamp_key(key)],
+            version=version)
+
+    def has_key(self, key, version=None):
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self.delete_local(self.make_key(key, version))
+        return self.shared.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        self.delete_local(self.make_key(key, version))
+        return self.shared.decr(key, delta, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
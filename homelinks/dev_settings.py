@@ -48,7 +48,6 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'django.middleware.cache.UpdateCacheMiddleware', # must be the first
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -58,7 +57,6 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
-    'django.middleware.cache.FetchFromCacheMiddleware', # must be the last
 ]
 
 ROOT_URLCONF = 'homelinks.urls'
@@ -145,6 +143,17 @@ STATIC_ROOT = os.path.join(os.path.dirname(BASE_DIR), 'public_html', 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(os.path.dirname(BASE_DIR), 'public_html', 'media')
 
+# Uploads, images are checked by their header as they arrive (see
+# links.uploads), and files larger than 256KB are spooled to disk
+FILE_UPLOAD_HANDLERS = [
+    'links.uploads.ImageUploadGuardHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024
+LINKS_IMAGE_MAX_BYTES = 5 * 1024 * 1024
+LINKS_IMAGE_MAX_PIXELS = 24 * 1000 * 1000
+
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "assets"),
 ]
@@ -185,7 +194,7 @@ AUTHENTICATION_BACKENDS = [
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     },
     'axes_cache': {
         'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
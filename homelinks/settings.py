@@ -34,7 +34,6 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'django.middleware.cache.UpdateCacheMiddleware', # must be the first
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -42,7 +41,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'django.middleware.cache.FetchFromCacheMiddleware', # must be the last
 ]
 
 
@@ -64,6 +62,57 @@ DATABASES = {
 }
 
 
+# Cache shared by all workers (processes), catalogue pages are cached until
+# a link changes (see links/cache.py)
+CACHES = {
+    # hot pages and template fragments are also kept in each worker
+    'default': {
+        'BACKEND': 'homelinks.cache.TwoTierCache',
+        'LOCATION': 'shared',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {
+            'LOCAL_MAX_ENTRIES': 1000,
+            'LOCAL_TIMEOUT': 5,
+            'LOCAL_KEY_PREFIXES': ['links:', 'template.cache.'],
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(os.path.dirname(BASE_DIR), 'cache'),
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'axes_cache': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+}
+
+# add of the file based cache is not atomic, locks of workers that refresh
+# cached pages are files (see links.cache)
+LINKS_CACHE_LOCK_DIR = os.path.join(os.path.dirname(BASE_DIR), 'cache-locks')
+
+# soft and hard timeouts (seconds) of cached pages, stale pages of the
+# current catalogue version are served while one worker refreshes them
+# (see links.cache)
+LINKS_CACHE_TIMEOUTS = {
+    'index': (60 * 10, 60 * 60 * 24),
+    'index-api': (60 * 10, 60 * 60 * 24),
+    'categories': (60 * 60, 60 * 60 * 24),
+    'categorized-items': (60 * 10, 60 * 60 * 6),
+    'category-count': (60 * 10, 60 * 60 * 6),
+}
+
+# widths of link image derivatives, each is made in the original format
+# and in WebP (see links.derivatives)
+LINKS_IMAGE_WIDTHS = (160, 320, 640)
+
+# seconds after a catalogue change to warm up hot pages in background
+# (see links.warmup), None to only warm up by `manage.py warm_cache`
+LINKS_WARM_ON_CHANGE_DELAY = None
+
+
 # Rechapcha
 RECAPTCHA_PRIVATE_KEY = ''
 RECAPTCHA_PUBLIC_KEY = ''
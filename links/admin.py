@@ -13,6 +13,7 @@ from .models import (
     Instagram,
     Report
 )
+from .mixins import UploadGuardAdminMixIn
 
 
 # Category
@@ -25,7 +26,8 @@ class CategoryAdmin(admin.ModelAdmin):
 
 # Website
 @admin.register(Website)
-class WebsiteAdmin(TaggitCounter, admin.ModelAdmin):
+class WebsiteAdmin(UploadGuardAdminMixIn, TaggitCounter,
+        admin.ModelAdmin):
     fields = ('author', 'type', 'title', 'status', 'url', 'category',
         'description', 'image')
     list_display = ('title', 'url', 'slug', 'status', 'author', 'category',
@@ -40,7 +42,8 @@ class WebsiteAdmin(TaggitCounter, admin.ModelAdmin):
 
 # Channel
 @admin.register(Channel)
-class ChannelAdmin(TaggitCounter, admin.ModelAdmin):
+class ChannelAdmin(UploadGuardAdminMixIn, TaggitCounter,
+        admin.ModelAdmin):
     fields = ('author', 'title', 'status', 'application', 'channel_id',
         'category', 'description', 'image')
     list_display = ('title', 'channel_id', 'application', 'slug', 'status',
@@ -55,7 +58,8 @@ class ChannelAdmin(TaggitCounter, admin.ModelAdmin):
 
 # Group
 @admin.register(Group)
-class GroupAdmin(TaggitCounter, admin.ModelAdmin):
+class GroupAdmin(UploadGuardAdminMixIn, TaggitCounter,
+        admin.ModelAdmin):
     fields = ('author', 'title', 'slug', 'status', 'url', 'application',
         'category', 'description', 'image')
     list_display = ('title', 'application', 'slug', 'status', 'author',
@@ -70,7 +74,8 @@ class GroupAdmin(TaggitCounter, admin.ModelAdmin):
 
 # Instagram
 @admin.register(Instagram)
-class InstagramAdmin(TaggitCounter, admin.ModelAdmin):
+class InstagramAdmin(UploadGuardAdminMixIn, TaggitCounter,
+        admin.ModelAdmin):
     fields = ('author', 'title', 'status', 'page_id', 'category', 'description',
         'image')
     list_display = ('title', 'slug', 'status', 'author', 'page_id', 'category',
@@ -1,7 +1,18 @@
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import ugettext_lazy as _
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import (
+	BasePagination,
 	LimitOffsetPagination,
 	PageNumberPagination,
 )
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from links.pagination import encode_cursor, decode_cursor
 
 
 class LinkLimitOffsetPagination(LimitOffsetPagination):
@@ -11,3 +22,73 @@ class LinkLimitOffsetPagination(LimitOffsetPagination):
 
 class LinkPageNumberPagination(PageNumberPagination):
 	page_size = 20
+
+
+class LinkKeysetPagination(BasePagination):
+	"""
+	Keyset pagination over (`created`, `id`), latest links first.
+	No count query and no offset is used, so every page costs the same
+	and links added while scrolling do not shift the pages.
+	"""
+	page_size = 20
+	cursor_query_param = 'cursor'
+	invalid_cursor_message = _('Invalid cursor')
+
+	def paginate_queryset(self, queryset, request, view=None):
+		self.request = request
+		cursor = request.query_params.get(self.cursor_query_param)
+		queryset = queryset.order_by('-created', '-id')
+		if cursor:
+			created, pk = self.decode(cursor)
+			queryset = queryset.filter(
+				Q(created__lt=created) | Q(created=created, id__lt=pk))
+
+		page = list(queryset[:self.page_size + 1])
+		self.has_next = len(page) > self.page_size
+		self.page = page[:self.page_size]
+		return self.page
+
+	def decode(self, cursor):
+		try:
+			created, pk = decode_cursor(cursor)
+			created = parse_datetime(created)
+		except (TypeError, ValueError):
+			raise NotFound(self.invalid_cursor_message)
+		if created is None or not isinstance(pk, int):
+			raise NotFound(self.invalid_cursor_message)
+		return created, pk
+
+	def get_next_link(self):
+		if not self.has_next:
+			return None
+		last = self.page[-1]
+		cursor = encode_cursor([last.created.isoformat(), last.id])
+		url = self.request.build_absolute_uri()
+		return replace_query_param(url, self.cursor_query_param, cursor)
+
+	def get_paginated_response(self, data):
+		return Response(OrderedDict([
+			('next', self.get_next_link()),
+			('results', data),
+		]))
+
+
+class LinkListPagination(LinkPageNumberPagination):
+	"""
+	Page number pagination by default, clients opt in to keyset
+	pagination by sending `cursor` query parameter (empty for first page).
+	"""
+	keyset_pagination_class = LinkKeysetPagination
+
+	def paginate_queryset(self, queryset, request, view=None):
+		self.keyset = None
+		cursor_query_param = self.keyset_pagination_class.cursor_query_param
+		if cursor_query_param in request.query_params:
+			self.keyset = self.keyset_pagination_class()
+			return self.keyset.paginate_queryset(queryset, request, view)
+		return super().paginate_queryset(queryset, request, view)
+
+	def get_paginated_response(self, data):
+		if self.keyset is not None:
+			return self.keyset.get_paginated_response(data)
+		return super().get_paginated_response(data)
@@ -10,8 +10,10 @@ from links.models import (
     Group,
     Instagram,
     Report,
+    LinkIndex,
 )
 from links import utils as links_utils
+from links.urlbuilder import url_builder
 from dashboard.api.serializers import UserSerializer
 from . import utils
 
@@ -28,6 +30,7 @@ class CategorySerializer(serializers.ModelSerializer):
 class WebsiteSerializer(serializers.ModelSerializer):
     detail_url = utils.WEBSITE_DETAIL_URL
     thumbnail = serializers.SerializerMethodField()
+    thumbnails = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Website
@@ -35,6 +38,11 @@ class WebsiteSerializer(serializers.ModelSerializer):
             'title',
             'detail_url',
             'thumbnail',
+            'thumbnails',
+            'image_width',
+            'image_height',
+            'image_color',
+            'image_placeholder',
             'created',
         ]
 
@@ -44,6 +52,7 @@ class WebsiteSerializer(serializers.ModelSerializer):
 
 class WebsiteDetailSerializer(serializers.ModelSerializer):
     author = UserSerializer()
+    images = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Website
@@ -56,6 +65,7 @@ class WebsiteDetailSerializer(serializers.ModelSerializer):
             'created',
             'description',
             'image',
+            'images',
         ]
 
 
@@ -97,6 +107,7 @@ class WebsiteUpdateSerializer(serializers.ModelSerializer):
 class ChannelSerializer(serializers.ModelSerializer):
     detail_url = utils.CHANNEL_DETAIL_URL
     thumbnail = serializers.SerializerMethodField()
+    thumbnails = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Channel
@@ -104,6 +115,11 @@ class ChannelSerializer(serializers.ModelSerializer):
             'title',
             'detail_url',
             'thumbnail',
+            'thumbnails',
+            'image_width',
+            'image_height',
+            'image_color',
+            'image_placeholder',
             'created'
         ]
 
@@ -113,6 +129,7 @@ class ChannelSerializer(serializers.ModelSerializer):
 
 class ChannelDetailSerializer(serializers.ModelSerializer):
     author = UserSerializer()
+    images = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Channel
@@ -126,6 +143,7 @@ class ChannelDetailSerializer(serializers.ModelSerializer):
             'created',
             'description',
             'image',
+            'images',
         ]
 
 
@@ -185,6 +203,7 @@ class ChannelUpdateSerializer(serializers.ModelSerializer):
 class GroupSerializer(serializers.ModelSerializer):
     detail_url = utils.GROUP_DETAIL_URL
     thumbnail = serializers.SerializerMethodField()
+    thumbnails = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Group
@@ -192,6 +211,11 @@ class GroupSerializer(serializers.ModelSerializer):
             'title',
             'detail_url',
             'thumbnail',
+            'thumbnails',
+            'image_width',
+            'image_height',
+            'image_color',
+            'image_placeholder',
             'created',
         ]
 
@@ -201,6 +225,7 @@ class GroupSerializer(serializers.ModelSerializer):
 
 class GroupDetailSerializer(serializers.ModelSerializer):
     author = UserSerializer()
+    images = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Group
@@ -213,6 +238,7 @@ class GroupDetailSerializer(serializers.ModelSerializer):
             'created',
             'description',
             'image',
+            'images',
         ]
 
 
@@ -254,6 +280,7 @@ class GroupUpdateSerializer(serializers.ModelSerializer):
 class InstagramSerializer(serializers.ModelSerializer):
     detail_url = utils.INSTAGRAM_DETAIL_URL
     thumbnail = serializers.SerializerMethodField()
+    thumbnails = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Instagram
@@ -261,6 +288,11 @@ class InstagramSerializer(serializers.ModelSerializer):
             'title',
             'detail_url',
             'thumbnail',
+            'thumbnails',
+            'image_width',
+            'image_height',
+            'image_color',
+            'image_placeholder',
             'created',
         ]
 
@@ -270,6 +302,7 @@ class InstagramSerializer(serializers.ModelSerializer):
 
 class InstagramDetailSerializer(serializers.ModelSerializer):
     author = UserSerializer()
+    images = serializers.ReadOnlyField(source='image_variants')
 
     class Meta:
         model = Instagram
@@ -282,6 +315,7 @@ class InstagramDetailSerializer(serializers.ModelSerializer):
             'created',
             'description',
             'image',
+            'images',
         ]
 
 
@@ -324,6 +358,42 @@ class InstagramUpdateSerializer(serializers.ModelSerializer):
 #----------------------------------------------------------
 
 
+class LinkIndexSerializer(serializers.ModelSerializer):
+    """
+    Serialize index entries of any link type, same as
+    WebsiteSerializer, ChannelSerializer, ...
+    """
+    detail_url = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+    thumbnails = serializers.ReadOnlyField(source='image_variants')
+
+    class Meta:
+        model = LinkIndex
+        fields = [
+            'title',
+            'detail_url',
+            'thumbnail',
+            'thumbnails',
+            'image_width',
+            'image_height',
+            'image_color',
+            'image_placeholder',
+            'created',
+        ]
+
+    def get_detail_url(self, obj):
+        url = url_builder.build(f'links-apis:{obj.model_name}-detail',
+            obj.slug, 'slug')
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_thumbnail(self, obj):
+        return obj.thumbnail_url
+#----------------------------------------------------------
+
+
 class LinkReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Report
@@ -97,6 +97,10 @@ urlpatterns = [
     # search
     path('search/', views.LinkSearchAPIView.as_view(), name='search'),
 
+    # search suggestions
+    path('search/suggest/', views.SearchSuggestAPIView.as_view(),
+        name='search-suggest'),
+
     # categories
     path('categories/', views.CategoryListAPIView.as_view(), name='categories'),
 
@@ -1,23 +1,47 @@
 from rest_framework import serializers
 
+from links.urlbuilder import url_builder
+
+
+class DetailURLField(serializers.HyperlinkedIdentityField):
+    """
+    Same as `HyperlinkedIdentityField`, but URLs are made by `url_builder`
+    instead of reversing the view for every object.
+    """
+
+    def get_url(self, obj, view_name, request, format):
+        if format or getattr(request, 'versioning_scheme', None):
+            # format suffixes and versioning are handled by reverse()
+            return super().get_url(obj, view_name, request, format)
+
+        # Unsaved objects will not yet have a valid URL.
+        if hasattr(obj, 'pk') and obj.pk in (None, ''):
+            return None
+
+        lookup_value = getattr(obj, self.lookup_field)
+        url = url_builder.build(view_name, lookup_value, self.lookup_url_kwarg)
+        if request is None:
+            return url
+        return request.build_absolute_uri(url)
+
 
 # url details
-WEBSITE_DETAIL_URL = serializers.HyperlinkedIdentityField(
+WEBSITE_DETAIL_URL = DetailURLField(
     view_name='links-apis:website-detail',
     lookup_field='slug',
 )
 
-CHANNEL_DETAIL_URL = serializers.HyperlinkedIdentityField(
+CHANNEL_DETAIL_URL = DetailURLField(
     view_name='links-apis:channel-detail',
     lookup_field='slug',
 )
 
-GROUP_DETAIL_URL = serializers.HyperlinkedIdentityField(
+GROUP_DETAIL_URL = DetailURLField(
     view_name='links-apis:group-detail',
     lookup_field='slug',
 )
 
-INSTAGRAM_DETAIL_URL = serializers.HyperlinkedIdentityField(
+INSTAGRAM_DETAIL_URL = DetailURLField(
     view_name='links-apis:instagram-detail',
     lookup_field='slug',
 )
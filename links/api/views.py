@@ -1,9 +1,6 @@
-from itertools import chain
 from urllib.parse import unquote
 
-from django.db.models import Q
 from django.http import Http404
-from django.contrib.contenttypes.models import ContentType
 from rest_framework.generics import get_object_or_404, GenericAPIView
 from rest_framework import status
 from rest_framework.response import Response
@@ -35,6 +32,7 @@ from links.models import (
     Group,
     Instagram,
     Report,
+    LinkIndex,
 )
 
 from .serializers import (
@@ -59,6 +57,7 @@ from .serializers import (
 	InstagramUpdateSerializer,
 
 	LinkReportSerializer,
+	LinkIndexSerializer,
 	CategorySerializer,
 )
 
@@ -70,17 +69,37 @@ from links.mixins import (
 	FilterByApplicationMixIn,
 	PaginateMixIn,
 	PublishedObjectMixIn,
+	FacetMixIn,
+	ConditionalGetMixIn,
+	ConditionalRetrieveMixIn,
 )
 
 from links import utils
-from .pagination import LinkPageNumberPagination
+from links.cache import get_or_compute
+from links.search import search as search_links
+from links.search import fuzzy_search as fuzzy_search_links
+from links.suggest import suggestions
+from links.registry import content_types
+from .pagination import LinkPageNumberPagination, LinkListPagination
 from .permissions import IsPremiumUser, IsOwner
 
 
-class IndexAPIView(APIView):
+class IndexAPIView(ConditionalGetMixIn, APIView):
 	permission_classes = [AllowAny]
 
 	def get(self, request, format=None):
+		response = self.get_not_modified_response(request)
+		if response is not None:
+			return response
+
+		# cached per host (urls are absolute), refreshed when a link is
+		# published, updated, unpublished or deleted
+		result = get_or_compute('index-api',
+			lambda: self.get_latest_links(request),
+			request.scheme, request.get_host())
+		return Response(result)
+
+	def get_latest_links(self, request):
 		websites = Website.published.all()[:12]
 		channels = Channel.published.all()[:12]
 		groups = Group.published.all()[:12]
@@ -101,17 +120,18 @@ class IndexAPIView(APIView):
 			'groups': serialized_groups.data,
 			'instagrams': serialized_instagrams.data,
 		}
-		return Response(result)
+		return result
 
 
-class WebsiteListAPIView(FilterByTypeMixIn, ListAPIView):
+class WebsiteListAPIView(ConditionalGetMixIn, FilterByTypeMixIn,
+		ListAPIView):
 	serializer_class = WebsiteSerializer
 	queryset = Website.published.all()
-	pagination_class = LinkPageNumberPagination
+	pagination_class = LinkListPagination
 	permission_classes = [AllowAny]
 
 
-class WebsiteDetailAPIView(RetrieveAPIView):
+class WebsiteDetailAPIView(ConditionalRetrieveMixIn, RetrieveAPIView):
 	serializer_class = WebsiteDetailSerializer
 	queryset = Website.published.all()
 	lookup_field = 'slug'
@@ -140,14 +160,16 @@ class WebsiteDeleteAPIView(DeleteAPIMixIn):
 #----------------------------------------------------------
 
 
-class ChannelListAPIView(FilterByApplicationMixIn, ListAPIView):
+class ChannelListAPIView(ConditionalGetMixIn, FilterByApplicationMixIn,
+		ListAPIView):
 	serializer_class = ChannelSerializer
 	queryset = Channel.published.all()
-	pagination_class = LinkPageNumberPagination
+	pagination_class = LinkListPagination
 	permission_classes = [AllowAny]
 
 
-class ChannelDetailAPIView(PublishedObjectMixIn, RetrieveAPIView):
+class ChannelDetailAPIView(ConditionalRetrieveMixIn, PublishedObjectMixIn,
+		RetrieveAPIView):
 	serializer_class = ChannelDetailSerializer
 	queryset = Channel.published.all()
 	lookup_field = 'slug'
@@ -174,14 +196,15 @@ class ChannelDeleteAPIView(DestroyAPIView):
 # ---------------------------------------------------------
 
 
-class GroupListAPIView(FilterByApplicationMixIn, ListAPIView):
+class GroupListAPIView(ConditionalGetMixIn, FilterByApplicationMixIn,
+		ListAPIView):
 	serializer_class = GroupSerializer
 	queryset = Group.published.all()
-	pagination_class = LinkPageNumberPagination
+	pagination_class = LinkListPagination
 	permission_classes = [AllowAny]
 
 
-class GroupDetailAPIView(RetrieveAPIView):
+class GroupDetailAPIView(ConditionalRetrieveMixIn, RetrieveAPIView):
 	serializer_class = GroupDetailSerializer
 	queryset = Group.published.all()
 	lookup_field = 'slug'
@@ -207,14 +230,14 @@ class GroupDeleteAPIView(DestroyAPIView):
 # --------------------------------------------------------
 
 
-class InstagramListAPIView(ListAPIView):
+class InstagramListAPIView(ConditionalGetMixIn, ListAPIView):
 	serializer_class = InstagramSerializer
 	queryset = Instagram.published.all()
-	pagination_class = LinkPageNumberPagination
+	pagination_class = LinkListPagination
 	permission_classes = [AllowAny]
 
 
-class InstagramDetailAPIView(RetrieveAPIView):
+class InstagramDetailAPIView(ConditionalRetrieveMixIn, RetrieveAPIView):
 	serializer_class = InstagramDetailSerializer
 	queryset = Instagram.published.all()
 	lookup_field = 'slug'
@@ -249,9 +272,10 @@ class ReportLinkAPIView(CreateAPIView):
 		model_name = self.kwargs.get('model_name')
 		slug = self.kwargs.get('slug')
 
-		content_type = ContentType.objects.get(model=model_name,
-			app_label='links')
-		model = content_type.model_class()
+		try:
+			model = content_types.get_link_model(model_name)
+		except LookupError:
+			raise Http404
 		obj = model.published.filter(slug=slug).first()
 		if obj is None:
 			raise Http404
@@ -268,108 +292,76 @@ class ReportLinkAPIView(CreateAPIView):
 		return serializer
 
 
-class CategoryListAPIView(ListAPIView):
+class CategoryListAPIView(ConditionalGetMixIn, ListAPIView):
 	serializer_class = CategorySerializer
 	queryset = Category.objects.all()
 	permission_classes = [AllowAny]
 
 
-class CategorizedItemsAPIListView(PaginateMixIn, GenericAPIView):
+class CategorizedItemsAPIListView(ConditionalGetMixIn, FacetMixIn,
+		PaginateMixIn, GenericAPIView):
 	"""
 	Get categorized items by category id
 	"""
+	serializer_class = LinkIndexSerializer
 	permission_classes = [AllowAny]
-	pagination_class = LinkPageNumberPagination
+	pagination_class = LinkListPagination
 
 	def get_queryset(self):
 		category_id = self.kwargs.get('category_id')
-		websites = Website.published.filter(category_id=category_id)
-		channels = Channel.published.filter(category_id=category_id)
-		groups = Group.published.filter(category_id=category_id)
-		instagrams = Instagram.published.filter(category_id=category_id)
+		return LinkIndex.objects.filter(category_id=category_id)
 
-		serialized_websites = WebsiteSerializer(websites, many=True,
-			context={'request': self.request})
-		serialized_channels = ChannelSerializer(channels, many=True,
-			context={'request': self.request})
-		serialized_groups = GroupSerializer(groups, many=True,
-			context={'request': self.request})
-		serialized_instagrams = InstagramSerializer(instagrams, many=True,
-			context={'request': self.request})
 
-		chained_links = chain(serialized_websites.data,
-			serialized_channels.data,
-			serialized_groups.data,
-			serialized_instagrams.data
-		)
-		return list(chained_links)
-
-
-class TaggedItemsAPIListView(PaginateMixIn, GenericAPIView):
+class TaggedItemsAPIListView(ConditionalGetMixIn, FacetMixIn,
+		PaginateMixIn, GenericAPIView):
 	"""
 	Get tagged items by tag slug
 	"""
+	serializer_class = LinkIndexSerializer
 	permission_classes = [AllowAny]
-	pagination_class = LinkPageNumberPagination
+	pagination_class = LinkListPagination
 
 	def get_queryset(self):
 		tag_slug = self.kwargs.get('tag_slug')
 		tag_slug = unquote(tag_slug)
 		tag = get_object_or_404(Tag, slug=tag_slug)
+		return LinkIndex.objects.filter(tags=tag)
 
-		websites = Website.published.filter(tags__in=[tag])
-		channels = Channel.published.filter(tags__in=[tag])
-		groups = Group.published.filter(tags__in=[tag])
-		instagrams = Instagram.published.filter(tags__in=[tag])
 
-		serialized_websites = WebsiteSerializer(websites, many=True,
-			context={'request': self.request})
-		serialized_channels = ChannelSerializer(channels, many=True,
-			context={'request': self.request})
-		serialized_groups = GroupSerializer(groups, many=True,
-			context={'request': self.request})
-		serialized_instagrams = InstagramSerializer(instagrams, many=True,
-			context={'request': self.request})
-
-		chained_links = chain(serialized_websites.data,
-			serialized_channels.data,
-			serialized_groups.data,
-			serialized_instagrams.data
-		)
-		return list(chained_links)
-
-
-class LinkSearchAPIView(PaginateMixIn, GenericAPIView):
+class LinkSearchAPIView(FacetMixIn, PaginateMixIn, GenericAPIView):
 	"""
-	Search items by given query named `q`
+	Search items by given query named `q`,
+	send `fuzzy=1` for typo-tolerant search.
 	"""
+	serializer_class = LinkIndexSerializer
 	permission_classes = [AllowAny]
 	pagination_class = LinkPageNumberPagination
 
 	def get_queryset(self):
 		q = self.request.GET.get('q')
-		if q:
-		    query = (Q(title__icontains=q) | Q(description__icontains=q))
-
-		    # search the query in published links
-		    search_result = chain(
-		        WebsiteSerializer(
-					Website.published.filter(query),
-					many=True,
-					context={'request': self.request}).data,
-		        ChannelSerializer(
-					Channel.published.filter(query),
-					many=True,
-					context={'request': self.request}).data,
-		        GroupSerializer(
-					Group.published.filter(query),
-					many=True,
-					context={'request': self.request}).data,
-		        InstagramSerializer(
-					Instagram.published.filter(query),
-					many=True,
-					context={'request': self.request}).data
-			)
-		else:
-		    return None
-		return list(search_result)
+		fuzzy = self.request.GET.get('fuzzy')
+		if q and fuzzy:
+			# typo-tolerant search, most similar links first
+			return fuzzy_search_links(q)
+		elif q:
+			# search the query in published links, best matches first
+			return search_links(q)
+		return LinkIndex.objects.none()
+
+
+class SearchSuggestAPIView(APIView):
+	"""
+	Suggest link titles, tags and categories starting with given query
+	named `q` (search-as-you-type).
+	"""
+	permission_classes = [AllowAny]
+
+	def get(self, request, format=None):
+		q = request.GET.get('q', '')
+		result = {
+			'suggestions': [
+				{'text': text, 'type': type}
+				for text, type in suggestions.suggest(q)
+			],
+		}
+		return Response(result)
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import get_language
+
+
+# seconds, cached pages are invalidated by version anyway
+TIMEOUT = getattr(settings, 'LINKS_CACHE_TIMEOUT', 60 * 60 * 24)
+# seconds before a cached page is refreshed (soft) and removed (hard),
+# per page name, eg. {'index': (300, 86400)}
+TIMEOUTS = getattr(settings, 'LINKS_CACHE_TIMEOUTS', {})
+SOFT_TIMEOUT = 60 * 10
+# seconds a worker may take to refresh a stale page
+LOCK_TIMEOUT = 30
+# seconds other workers wait for a missing page to be computed, before
+# computing it themselves
+WAIT_TIMEOUT = getattr(settings, 'LINKS_CACHE_WAIT_TIMEOUT', 5)
+WAIT_INTERVAL = 0.05
+# directory of refresh locks, `cache.add` is used if it is not set. Set it
+# if `add` of the cache backend is not atomic (eg. file based cache).
+LOCK_DIR = getattr(settings, 'LINKS_CACHE_LOCK_DIR', None)
+CATALOGUE_VERSION_KEY = 'links:catalogue-version'
+
+
+def get_catalogue_version():
+    """
+    Version of the published catalogue, it changes whenever a link is
+    published, edited, unpublished or deleted.
+    """
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        # start from current time so evicted versions are never reused
+        cache.add(CATALOGUE_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(CATALOGUE_VERSION_KEY, 0)
+    return version
+
+
+def _bump_catalogue_version():
+    try:
+        cache.incr(CATALOGUE_VERSION_KEY)
+    except ValueError:
+        # version key was evicted. It is written by `add` (never `set`), so
+        # backends that wrap values of `set` (see
+        # `homelinks.cache.TwoTierCache`) keep it a plain integer that can
+        # be incremented. If another worker added it meanwhile, increment
+        # that one.
+        if not cache.add(CATALOGUE_VERSION_KEY, int(time.time() * 1000),
+                None):
+            cache.incr(CATALOGUE_VERSION_KEY)
+
+    # imported here, warmup depends on models which depend on this module
+    from links.warmup import schedule_warm_up
+    schedule_warm_up()
+
+
+def bump_catalogue_version():
+    """
+    Invalidate all cached catalogue pages, once current transaction
+    is committed (so no one caches data of the old version again).
+    """
+    transaction.on_commit(_bump_catalogue_version)
+
+
+def make_key(name, *parts):
+    """Cache key of a catalogue page for the active language"""
+    parts = ':'.join(str(part) for part in parts)
+    return f'links:{name}:{get_language()}:{parts}'
+
+
+def get_lock_path(key):
+    name = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.join(LOCK_DIR, f'{name}.lock')
+
+
+def acquire_lock(key):
+    """Take the lock `key` for LOCK_TIMEOUT seconds, return if it is taken"""
+    if LOCK_DIR is None:
+        return cache.add(key, True, LOCK_TIMEOUT)
+
+    path = get_lock_path(key)
+    for attempt in range(2):
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileNotFoundError:
+            os.makedirs(LOCK_DIR, exist_ok=True)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) < LOCK_TIMEOUT:
+                    return False
+                # the worker that took it died
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    return False
+
+
+def release_lock(key):
+    if LOCK_DIR is None:
+        cache.delete(key)
+        return
+    try:
+        os.remove(get_lock_path(key))
+    except FileNotFoundError:
+        pass
+
+
+def wait_for_entry(key, version):
+    """
+    Return entry of `key` for `version` (or a later one) once another
+    worker caches it, None if it is not cached in WAIT_TIMEOUT seconds.
+    """
+    deadline = time.time() + WAIT_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry[1] >= version:
+            return entry
+    return None
+
+
+def get_or_compute(name, compute, *parts):
+    """
+    Return cached result of `compute()` for the page `name` (`parts` are
+    added to the key).
+
+    Results of an older catalogue version are never returned. A result of
+    the current version gets stale after the soft timeout, then only the
+    worker that takes the refresh lock computes it again and meanwhile
+    other workers get the stale result. Missing results (first request,
+    hard timeout or a new version) are computed by the worker that takes
+    the lock too, other workers wait for it. So expiry of a popular page
+    does not send every request to database.
+    """
+    soft_timeout, hard_timeout = TIMEOUTS.get(name, (SOFT_TIMEOUT, TIMEOUT))
+    key = make_key(name, *parts)
+    lock_key = f'{key}:lock'
+    version = get_catalogue_version()
+
+    entry = cache.get(key)
+    if entry is not None and entry[1] >= version:
+        value, entry_version, stale_at = entry
+        if time.time() < stale_at:
+            return value
+        locked = acquire_lock(lock_key)
+        if not locked:
+            # another worker is refreshing it
+            return value
+    else:
+        locked = acquire_lock(lock_key)
+        if not locked:
+            entry = wait_for_entry(key, version)
+            if entry is not None:
+                return entry[0]
+
+    try:
+        value = compute()
+        # version is read before computing, so changes made meanwhile
+        # make the result stale
+        cache.set(key, (value, version, time.time() + soft_timeout),
+            hard_timeout)
+    finally:
+        if locked:
+            release_lock(lock_key)
+    return value
+
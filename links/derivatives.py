@@ -0,0 +1,272 @@
+import base64
+import hashlib
+import io
+import mimetypes
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from PIL import Image, ImageFilter, ImageOps
+
+
+# widths of derivatives (responsive variants) of link images, each width
+# is made in the source format and in WebP, within a 4:3 box
+WIDTHS = tuple(sorted(set(getattr(settings, 'LINKS_IMAGE_WIDTHS',
+    (160, 320, 640))) | {160, 320}))
+# width of the image shown in lists and in detail pages
+THUMBNAIL_WIDTH = 160
+SCALED_WIDTH = 320
+# '' is the source format
+FORMATS = ('', 'webp')
+WEBP_QUALITY = getattr(settings, 'LINKS_IMAGE_WEBP_QUALITY', 80)
+DIRECTORY = 'derivatives'
+# version of the transform (see `decode` and `resize`), part of keys so
+# changing it makes all derivatives again: after changing it (or widths,
+# formats, quality) run `rederive_images`, it makes the new derivatives
+# and removes the old ones
+VERSION = 2
+# width of the blurred placeholder shown until an image is loaded, and of
+# the image whose dominant colour is found
+PLACEHOLDER_WIDTH = 16
+COLOR_WIDTH = 64
+EXIF_ORIENTATION = 0x0112
+# derivatives made with other widths, formats or transform have other
+# names, links record the signature of settings their derivatives were
+# made with and show the original image until `rederive_images` makes them
+SIGNATURE = hashlib.sha256(
+    f'{WIDTHS}:{FORMATS}:{WEBP_QUALITY}:{VERSION}'.encode()).hexdigest()[:16]
+# orientations that rotate the image by 90 or 270 degrees
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+# formats that derivatives in source format are saved in, if it is not the
+# format of the source (JPEGs with more pictures are opened as MPO)
+SAVE_FORMATS = {'MPO': 'JPEG'}
+
+
+def get_file_hash(file):
+    """
+    Return sha256 of contents of `file` (a django File, eg. an upload or
+    an image field), the file is left open if it was open.
+    """
+    closed = file.closed
+    sha = hashlib.sha256()
+    file.open('rb')
+    try:
+        for chunk in file.chunks():
+            sha.update(chunk)
+    finally:
+        if closed:
+            file.close()
+        else:
+            file.seek(0)
+    return sha.hexdigest()
+
+
+def get_size(width):
+    return width, width * 3 // 4
+
+
+def get_ext(source_ext, format):
+    if format:
+        return f'.{format}'
+    return source_ext.lower()
+
+
+def get_variants():
+    """(width, format) of all derivatives"""
+    return [(width, format) for width in WIDTHS for format in FORMATS]
+
+
+def get_variant_name(width, format):
+    """Name of a derivative, eg. 320 or 320.webp"""
+    return f'{width}.{format}' if format else str(width)
+
+
+def get_key(source_hash, width, format, source_ext):
+    """
+    Key of a derivative of the source, it changes whenever source contents
+    or transform parameters change
+    """
+    width, height = get_size(width)
+    ext = get_ext(source_ext, format)
+    params = f'{source_hash}:{width}x{height}:{ext}:{VERSION}'
+    if format == 'webp':
+        params += f':{WEBP_QUALITY}'
+    return hashlib.sha256(params.encode()).hexdigest()
+
+
+def is_current(key, image_hash, name, file_name):
+    """
+    Whether a derivative (key, image hash, name and storage name of its
+    file) is made by current settings, so links may use it.
+    """
+    width, dot, format = name.partition('.')
+    if format not in FORMATS or not width.isdigit() or \
+            int(width) not in WIDTHS:
+        return False
+    # source extension of derivatives in source format
+    ext = os.path.splitext(file_name)[1]
+    return key == get_key(image_hash, int(width), format, ext)
+
+
+def get_name(key, ext):
+    """Storage name of derivative file"""
+    return f'{DIRECTORY}/{key[:2]}/{key}{ext}'
+
+
+def get_url(source_name, source_hash, width, format=''):
+    source_ext = os.path.splitext(source_name)[1]
+    key = get_key(source_hash, width, format, source_ext)
+    return default_storage.url(get_name(key, get_ext(source_ext, format)))
+
+
+def get_srcset(source_name, source_hash, format=''):
+    """Value of `srcset` attribute with all widths of the format"""
+    return ', '.join(
+        f'{get_url(source_name, source_hash, width, format)} {width}w'
+        for width in WIDTHS)
+
+
+def get_type(source_name, format=''):
+    if format:
+        return f'image/{format}'
+    return mimetypes.guess_type(source_name)[0]
+
+
+def decode(source_path, width):
+    """
+    Decode the source image once, upright (by its EXIF orientation), and
+    JPEGs only at the smallest scale that still covers derivatives of
+    `width`, so a large photo is never decoded at full size.
+    Return the image, the (upright) size and the format of the source.
+    """
+    img = Image.open(source_path)
+    source_format = img.format
+    orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+    source_size = img.size
+    box = get_size(width)
+    if orientation in ROTATED_ORIENTATIONS:
+        # box of the stored (not yet rotated) image
+        box = box[::-1]
+        source_size = source_size[::-1]
+    img.draft(None, box)
+    img.load()
+    if orientation != 1:
+        img = ImageOps.exif_transpose(img)
+
+    # other formats are decoded at full size, shrink them once (with a
+    # fast filter) to twice the box, derivatives are resampled from that
+    box_width, box_height = get_size(width)
+    scale = max(box_width * 2 / img.width, box_height * 2 / img.height)
+    if scale < 1:
+        size = (round(img.width * scale), round(img.height * scale))
+        img = img.resize(size, Image.BOX)
+    return img, source_size, source_format
+
+
+def resize(img, width, format):
+    """
+    Derivative of the decoded image that fits the box of `width`, ready to
+    be saved in the format. Unlike `Image.thumbnail` the decoded image is
+    not copied.
+    """
+    box_width, box_height = get_size(width)
+    scale = min(box_width / img.width, box_height / img.height, 1)
+    size = (max(round(img.width * scale), 1), max(round(img.height * scale), 1))
+    derivative = img.resize(size, Image.BICUBIC)
+    if format == 'webp' and derivative.mode not in ('RGB', 'RGBA'):
+        has_alpha = 'transparency' in derivative.info or \
+            derivative.mode in ('LA', 'PA')
+        derivative = derivative.convert('RGBA' if has_alpha else 'RGB')
+    return derivative
+
+
+def save(img, path, format, source_format):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if format == 'webp':
+        img.save(path, 'WEBP', quality=WEBP_QUALITY)
+    else:
+        # not by extension, the source may have none or a wrong one
+        img.save(path, SAVE_FORMATS.get(source_format, source_format))
+
+
+def describe(img, source_size):
+    """
+    Return width, height, dominant colour and placeholder (a tiny blurred
+    WebP as data URI) of the decoded image, fields of links (see
+    `links.models.IMAGE_INFO_FIELDS`).
+    """
+    small = resize(img, COLOR_WIDTH, '').convert('RGB')
+    quantized = small.quantize(colors=4)
+    count, index = max(quantized.getcolors())
+    red, green, blue = quantized.getpalette()[index * 3:index * 3 + 3]
+
+    placeholder = resize(small, PLACEHOLDER_WIDTH, '')
+    placeholder = placeholder.filter(ImageFilter.GaussianBlur(1))
+    data = io.BytesIO()
+    placeholder.save(data, 'WEBP', quality=40)
+    width, height = source_size
+    return {
+        'image_width': width,
+        'image_height': height,
+        'image_color': f'#{red:02x}{green:02x}{blue:02x}',
+        'image_placeholder': 'data:image/webp;base64,' +
+            base64.b64encode(data.getvalue()).decode(),
+    }
+
+
+def write_all(source_path, targets):
+    """
+    Write derivatives of the source image from a single decode, `targets`
+    are (path, width, format). Return description of the image (see
+    `describe`).
+    """
+    width = max([COLOR_WIDTH] + [width for path, width, format in targets])
+    img, source_size, source_format = decode(source_path, width)
+    for path, width, format in targets:
+        save(resize(img, width, format), path, format, source_format)
+    return describe(img, source_size)
+
+
+def make_all(source_path, variants):
+    """
+    Make derivatives of the source image, `variants` maps keys to (width,
+    format), return storage names of derivatives by key and description of
+    the image.
+    """
+    source_ext = os.path.splitext(source_path)[1]
+    file_names = {}
+    targets = []
+    for key, (width, format) in variants.items():
+        file_name = get_name(key, get_ext(source_ext, format))
+        file_names[key] = file_name
+        targets.append((default_storage.path(file_name), width, format))
+    info = write_all(source_path, targets)
+    return file_names, info
+
+
+def derive(source_name, force=False):
+    """
+    Make derivatives of a stored image that are missing (all of them if
+    `force`), return (source hash, {key: (width, format, storage name)}
+    of all derivatives, number of made derivatives, description of the
+    image). It does not use the database, so it can run in other
+    processes.
+    """
+    with default_storage.open(source_name) as file:
+        source_hash = get_file_hash(file)
+    source_ext = os.path.splitext(source_name)[1]
+    variants = {}
+    missing = {}
+    for width, format in get_variants():
+        key = get_key(source_hash, width, format, source_ext)
+        name = get_name(key, get_ext(source_ext, format))
+        variants[key] = (width, format, name)
+        if force or not default_storage.exists(name):
+            missing[key] = (width, format)
+    file_names, info = make_all(default_storage.path(source_name), missing)
+    return source_hash, variants, len(missing), info
+
+
+def remove(file_names):
+    for file_name in file_names:
+        default_storage.delete(file_name)
@@ -0,0 +1,70 @@
+from django.db.models import Count
+
+from links import models
+
+
+# query parameter -> LinkIndex field
+FACETS = {
+    'model': 'model_name',
+    'app': 'application',
+    'type': 'type',
+    'category': 'category',
+}
+
+
+def get_filters(params):
+    """
+    Values of facet query parameters by LinkIndex field.
+    A parameter can be repeated, eg. `?app=telegram&app=gap`.
+    """
+    filters = {}
+    for param, field in FACETS.items():
+        values = [value for value in params.getlist(param) if value]
+        if field == 'category':
+            values = [value for value in values if value.isdigit()]
+        if values:
+            filters[field] = values
+    return filters
+
+
+def filter_by_facets(queryset, params):
+    """
+    Filter index entries by facet query parameters.
+    """
+    for field, values in get_filters(params).items():
+        queryset = queryset.filter(**{f'{field}__in': values})
+    return queryset
+
+
+def get_facets(queryset, params):
+    """
+    Count index entries of queryset per link type, application,
+    website type and category, with a single grouped query.
+    Each facet is counted with filters of the other facets in params,
+    so other values of a filtered facet still have their counts.
+    """
+    filters = {field: set(values)
+        for field, values in get_filters(params).items()}
+    fields = list(FACETS.values())
+    rows = (models.LinkIndex.objects
+        .filter(pk__in=queryset.values('pk'))
+        .values(*fields)
+        .annotate(count=Count('id'))
+        .order_by())
+
+    facets = {param: {} for param in FACETS}
+    for row in rows:
+        # facets whose filter excludes the row
+        excluded = [field for field, values in filters.items()
+            if str(row[field]) not in values]
+        if len(excluded) > 1:
+            continue
+        for param, field in FACETS.items():
+            if excluded and excluded != [field]:
+                continue
+            value = row[field]
+            if value in ('', None):
+                continue
+            counts = facets[param]
+            counts[value] = counts.get(value, 0) + row['count']
+    return facets
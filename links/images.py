@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.db.models import (Case, CharField, IntegerField, TextField,
+    Value, When)
+
+from links import derivatives
+from links import models
+from links.cache import bump_catalogue_version
+from links.registry import content_types
+
+
+def process_job(job):
+    """
+    Make derivatives (all widths and formats) of the job's image that are
+    not made yet, and describe the image (size, colour, placeholder).
+    Return False if job is obsolete (link is deleted or has a new image).
+    """
+    model = content_types.get_link_model(job.model_name)
+    link = model.objects.filter(pk=job.object_id, image=job.image).first()
+    if link is None:
+        return False
+
+    image_hash = link.image_hash
+    if not image_hash:
+        # queued before images were hashed
+        image_hash = derivatives.get_file_hash(link.image)
+    info = models.ImageDerivative.objects.make(image_hash, link.image.path)
+
+    # parent and child may share the image
+    with transaction.atomic():
+        model.objects.filter(image=job.image).update(
+            image_hash=image_hash, thumbnail_ready=True,
+            derivatives_signature=derivatives.SIGNATURE, **info)
+        models.LinkIndex.objects.filter(image=job.image).update(
+            image_hash=image_hash, thumbnail_ready=True,
+            derivatives_signature=derivatives.SIGNATURE, **info)
+        bump_catalogue_version()
+    return True
+
+
+def record(results):
+    """
+    Record derivatives made by `derivatives.derive` and mark links of the
+    images ready, `results` are (image, image hash, variants, info).
+    """
+    if not results:
+        return
+    records = []
+    hashes = []
+    infos = {field: [] for field in models.IMAGE_INFO_FIELDS}
+    for image, image_hash, variants, info in results:
+        for key, (width, format, file_name) in variants.items():
+            records.append(models.ImageDerivative(key=key,
+                image_hash=image_hash,
+                name=derivatives.get_variant_name(width, format),
+                file=file_name))
+        hashes.append(When(image=image, then=Value(image_hash)))
+        for field, value in info.items():
+            infos[field].append(When(image=image, then=Value(value)))
+    images = [result[0] for result in results]
+    image_hash = Case(*hashes, output_field=CharField())
+    output_fields = {'image_width': IntegerField(),
+        'image_height': IntegerField(), 'image_color': CharField(),
+        'image_placeholder': TextField()}
+    info = {field: Case(*whens, output_field=output_fields[field])
+        for field, whens in infos.items()}
+
+    with transaction.atomic():
+        models.ImageDerivative.objects.bulk_create(records,
+            ignore_conflicts=True)
+        for model in (models.Website, models.Channel, models.Group,
+                models.Instagram, models.LinkIndex):
+            model.objects.filter(image__in=images).update(
+                image_hash=image_hash, thumbnail_ready=True,
+                derivatives_signature=derivatives.SIGNATURE, **info)
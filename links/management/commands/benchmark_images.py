@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image, ImageOps
+
+from links import derivatives
+
+
+def decode_per_derivative(source_path, targets):
+    # how derivatives were made before links.derivatives.write_all
+    for path, width, format in targets:
+        img = Image.open(source_path)
+        source_format = img.format
+        img.thumbnail(derivatives.get_size(width))
+        if format == 'webp' and img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGB')
+        derivatives.save(img, path, format, source_format)
+
+
+def decode_full_size(source_path, targets):
+    # single decode without JPEG draft mode
+    source = Image.open(source_path)
+    img = ImageOps.exif_transpose(source)
+    for path, width, format in targets:
+        derivatives.save(derivatives.resize(img, width, format), path, format,
+            source.format)
+
+
+METHODS = {
+    'decode per derivative': decode_per_derivative,
+    'single full size decode': decode_full_size,
+    'single decode': derivatives.write_all,
+}
+
+
+def get_rss(field):
+    """VmRSS (current) or VmHWM (peak) of this process in bytes (Linux)"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(f'{field}:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def reset_peak_rss():
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')
+
+
+def run(method, source_path, directory, repeat):
+    """
+    Run `method` in this (fresh) process, return seconds of the fastest run
+    and peak memory above idle of the largest run.
+    """
+    targets = []
+    ext = os.path.splitext(source_path)[1]
+    for width, format in derivatives.get_variants():
+        name = f'{width}{derivatives.get_ext(ext, format)}'
+        targets.append((os.path.join(directory, name), width, format))
+
+    times = []
+    peaks = []
+    for i in range(repeat):
+        idle_rss = get_rss('VmRSS')
+        reset_peak_rss()
+        start = time.perf_counter()
+        METHODS[method](source_path, targets)
+        times.append(time.perf_counter() - start)
+        peaks.append(get_rss('VmHWM') - idle_rss)
+    return min(times), max(peaks)
+
+
+def make_photo(path, width, height):
+    """
+    Noisy JPEG (like a photo) of width x height, stored rotated (height x
+    width) with EXIF orientation 6 like photos of phones
+    """
+    noise = [Image.effect_noise((height, width), 64) for i in range(3)]
+    img = Image.merge('RGB', noise)
+    exif = Image.Exif()
+    exif[derivatives.EXIF_ORIENTATION] = 6
+    img.save(path, quality=90, exif=exif)
+
+
+class Command(BaseCommand):
+    help = ('Measure wall time and peak memory of making derivatives of '
+            'large images, per method of decoding')
+
+    def add_arguments(self, parser):
+        parser.add_argument('images', nargs='*',
+            help='Images to benchmark (default: a generated photo)')
+        parser.add_argument('--size', default='6000x4000',
+            help='Size of the generated photo, WIDTHxHEIGHT')
+        parser.add_argument('--repeat', type=int, default=3,
+            help='Runs per image and method, the fastest is reported')
+
+    def handle(self, *args, **options):
+        # each method runs in a new process, so peak memory of one method
+        # is not hidden by another
+        context = multiprocessing.get_context('spawn')
+        with tempfile.TemporaryDirectory() as directory:
+            images = options['images']
+            if not images:
+                try:
+                    width, height = map(int, options['size'].split('x'))
+                except ValueError:
+                    raise CommandError('--size must be like 6000x4000')
+                path = os.path.join(directory, 'photo.jpg')
+                make_photo(path, width, height)
+                images = [path]
+
+            for path in images:
+                with Image.open(path) as img:
+                    size = '{}x{}'.format(*img.size)
+                self.stdout.write(f'{path} ({size}, '
+                    f'{os.path.getsize(path) / 2 ** 20:.1f}MB), '
+                    f'{len(derivatives.get_variants())} derivatives')
+                for method in METHODS:
+                    with context.Pool(1) as pool:
+                        seconds, rss = pool.apply(run,
+                            (method, path, directory, options['repeat']))
+                    self.stdout.write(f'  {method:24} {seconds * 1000:8.1f}ms'
+                        f' {rss / 2 ** 20:8.1f}MB peak RSS')
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+
+from homelinks.cache import TwoTierCache
+
+
+FIELDS = ('local_hits', 'local_misses', 'shared_hits', 'shared_misses',
+    'local_entries')
+
+
+def get_ratio(hits, misses):
+    total = hits + misses
+    return f'{hits / total:.1%}' if total else '-'
+
+
+class Command(BaseCommand):
+    help = ('Show hits and misses of local and shared tiers of two-tier '
+            'caches, as published by each worker process')
+
+    def write_stats(self, name, stats):
+        self.stdout.write(f'{name}: ' + ', '.join(
+            f'{field} {stats[field]}' for field in FIELDS))
+        self.stdout.write('    local hit ratio {}, shared hit ratio {}'.format(
+            get_ratio(stats['local_hits'], stats['local_misses']),
+            get_ratio(stats['shared_hits'], stats['shared_misses'])))
+
+    def handle(self, *args, **options):
+        aliases = [alias for alias in settings.CACHES
+            if isinstance(caches[alias], TwoTierCache)]
+        if not aliases:
+            self.stdout.write('There is no two-tier cache')
+            return
+
+        for alias in aliases:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'Cache {alias}'))
+            processes = caches[alias].get_all_stats()
+            if not processes:
+                self.stdout.write('No statistics published yet')
+                continue
+            total = dict.fromkeys(FIELDS, 0)
+            for process, stats in sorted(processes.items()):
+                self.write_stats(process, stats)
+                for field in FIELDS:
+                    total[field] += stats[field]
+            self.write_stats(f'total ({len(processes)} processes)', total)
@@ -0,0 +1,44 @@
+import time
+import traceback
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from links.images import process_job
+from links.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = 'Make scaled images and thumbnails of queued link images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+            help='Exit when there is no pending job')
+        parser.add_argument('--sleep', type=float, default=2,
+            help='Seconds to wait for new jobs')
+        parser.add_argument('--stale-after', type=int, default=600,
+            help='Seconds after which running jobs are considered dead '
+                 'and queued again')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            ImageJob.objects.requeue_stale(options['stale_after'])
+            job = ImageJob.objects.claim()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            try:
+                processed = process_job(job)
+            except Exception:
+                job.fail(traceback.format_exc())
+                self.stderr.write(f'{job}: failed ({job.status})')
+            else:
+                job.delete()
+                if processed:
+                    self.stdout.write(f'{job}: done')
+                else:
+                    self.stdout.write(f'{job}: skipped (obsolete)')
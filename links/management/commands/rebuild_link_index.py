@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from links.models import Website, Channel, Group, Instagram, LinkIndex
+
+
+class Command(BaseCommand):
+    help = 'Rebuild index of published links (LinkIndex) from scratch'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            LinkIndex.objects.all().delete()
+            for model in (Website, Channel, Group, Instagram):
+                count = 0
+                for link in model.published.prefetch_related('tags'):
+                    LinkIndex.objects.sync(link)
+                    count += 1
+                self.stdout.write(f'{model.__name__}: {count} links indexed')
+        self.stdout.write(self.style.SUCCESS('Link index rebuilt'))
@@ -0,0 +1,126 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from links import derivatives
+from links.cache import bump_catalogue_version
+from links.images import record
+from links.models import ImageBlob, ImageDerivative
+
+
+def derive(image, force):
+    """Run in worker processes, errors are returned to be reported"""
+    try:
+        image_hash, variants, made, info = derivatives.derive(image, force)
+    except Exception as e:
+        return image, None, f'{e.__class__.__name__}: {e}'
+    return image, (image_hash, variants, made, info), None
+
+
+class Command(BaseCommand):
+    help = ('Make derivatives of all link images again (eg. after '
+            'changing LINKS_IMAGE_WIDTHS) and describe the images, only '
+            'missing derivatives by default. Derivatives of older settings '
+            'are removed once all images are done')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+            help='Number of processes making derivatives')
+        parser.add_argument('--batch-size', type=int, default=100,
+            help='Number of images recorded in each transaction')
+        parser.add_argument('--rate', type=float, default=0,
+            help='Maximum images per second, 0 for no limit')
+        parser.add_argument('--force', action='store_true',
+            help='Make derivatives that exist too')
+        parser.add_argument('--checkpoint', default='rederive_images.json',
+            help='File that keeps progress, to resume an interrupted run')
+        parser.add_argument('--restart', action='store_true',
+            help='Ignore the checkpoint and start from the first image')
+
+    def read_checkpoint(self, path):
+        try:
+            with open(path) as checkpoint:
+                return json.load(checkpoint)
+        except FileNotFoundError:
+            return {'last_id': 0, 'done': 0, 'failed': 0}
+
+    def write_checkpoint(self, path, state):
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as checkpoint:
+            json.dump(state, checkpoint)
+        os.replace(temp_path, path)
+
+    def handle(self, *args, **options):
+        path = options['checkpoint']
+        if options['restart']:
+            state = {'last_id': 0, 'done': 0, 'failed': 0}
+        else:
+            state = self.read_checkpoint(path)
+            if state['last_id']:
+                self.stdout.write(f'Resuming after image {state["last_id"]}')
+
+        images = ImageBlob.objects.order_by('pk').values_list('pk', 'file')
+        total = images.filter(pk__gt=state['last_id']).count()
+        processed = 0
+        made = 0
+        start = time.perf_counter()
+
+        # forked workers must not share connections of this process
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                batch = list(images.filter(
+                    pk__gt=state['last_id'])[:options['batch_size']])
+                if not batch:
+                    break
+                results = []
+                files = [image for pk, image in batch]
+                forces = [options['force']] * len(batch)
+                for image, result, error in executor.map(derive, files,
+                        forces):
+                    if error:
+                        state['failed'] += 1
+                        self.stderr.write(f'{image}: {error}')
+                        continue
+                    image_hash, variants, image_made, info = result
+                    results.append((image, image_hash, variants, info))
+                    made += image_made
+                record(results)
+
+                state['last_id'] = batch[-1][0]
+                state['done'] += len(results)
+                self.write_checkpoint(path, state)
+
+                processed += len(batch)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f'{processed}/{total} images, '
+                    f'{processed / elapsed:.1f} images/s, '
+                    f'{made} derivatives made')
+
+                if options['rate']:
+                    # sleep until the batch is due by the rate
+                    delay = processed / options['rate'] - elapsed
+                    if delay > 0:
+                        time.sleep(delay)
+
+        elapsed = time.perf_counter() - start
+        if processed:
+            bump_catalogue_version()
+        self.stdout.write(f'{processed} images in {elapsed:.1f}s '
+            f'({processed / max(elapsed, 1e-9):.1f} images/s), '
+            f'{made} derivatives made, {state["failed"]} failed in total')
+        # links of failed images keep showing their original image
+        removed = ImageDerivative.objects.remove_stale()
+        self.stdout.write(f'{removed} derivatives of older settings removed')
+        # finished, next run starts from the first image
+        if os.path.exists(path):
+            os.remove(path)
+        if state['failed']:
+            self.stdout.write(self.style.WARNING(
+                f'{state["failed"]} images failed, see errors above'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Derivatives made'))
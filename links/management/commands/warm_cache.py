@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from links.warmup import TOP, WORKERS, get_hot_paths, warm_up
+
+
+class Command(BaseCommand):
+    help = 'Render hot pages in all languages to fill the cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*',
+            help='Paths to warm up (default: configured hot pages and '
+                 'categories and tags with most links)')
+        parser.add_argument('--top', type=int, default=TOP,
+            help='Number of categories and tags to warm up')
+        parser.add_argument('--workers', type=int, default=WORKERS,
+            help='Number of pages rendered concurrently')
+        parser.add_argument('--host', default=settings.ALLOWED_HOSTS[0],
+            help='Host name of requests, it is part of some cache keys')
+        parser.add_argument('--http', action='store_true',
+            help='Use http instead of https')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or get_hot_paths(options['top'])
+        results = warm_up(paths, workers=options['workers'],
+            host=options['host'], secure=not options['http'])
+
+        total = 0
+        failed = 0
+        for path, status_code, seconds in results:
+            total += seconds
+            if status_code != 200:
+                failed += 1
+            self.stdout.write(f'{status_code} {seconds * 1000:8.1f}ms {path}')
+
+        self.stdout.write(f'{len(results)} pages, {total:.2f}s in total')
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} pages failed'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Cache warmed up'))
@@ -0,0 +1,49 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taggit', '0004_auto_20190414_1524'),
+        ('links', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(choices=[('website', 'Website'), ('channel', 'Channel'), ('group', 'Group'), ('instagram', 'Instagram')], max_length=9)),
+                ('object_id', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=60)),
+                ('slug', models.SlugField(max_length=60)),
+                ('description', models.TextField(max_length=500)),
+                ('image', models.ImageField(upload_to='')),
+                ('application', models.CharField(blank=True, max_length=8)),
+                ('type', models.CharField(blank=True, max_length=7)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('published', 'Published')], max_length=10)),
+                ('created', models.DateTimeField()),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='links.Category')),
+                ('tags', models.ManyToManyField(related_name='_linkindex_tags_+', to='taggit.Tag')),
+            ],
+            options={
+                'ordering': ('-created', '-id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='linkindex',
+            index=models.Index(fields=['-created', '-id'], name='links_linki_created_58db25_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='linkindex',
+            index=models.Index(fields=['category', '-created'], name='links_linki_categor_c1a044_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='linkindex',
+            unique_together={('model_name', 'object_id')},
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('links', '0002_linkindex'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='linkindex',
+            name='term_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('frequency', models.PositiveIntegerField()),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='links.LinkIndex')),
+            ],
+            options={
+                'unique_together': {('term', 'entry')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('links', '0003_searchposting'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='channel',
+            index=models.Index(fields=['-created', '-id'], name='links_chann_created_d89ef6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['-created', '-id'], name='links_group_created_e332f4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='instagram',
+            index=models.Index(fields=['-created', '-id'], name='links_insta_created_a4c9d0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='website',
+            index=models.Index(fields=['-created', '-id'], name='links_websi_created_28c162_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:48
+
+from django.db import migrations, models
+
+
+def mark_thumbnails_ready(apps, schema_editor):
+    # existing links already have thumbnails
+    for model_name in ('Website', 'Channel', 'Group', 'Instagram', 'LinkIndex'):
+        apps.get_model('links', model_name).objects.update(thumbnail_ready=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('links', '0005_searchtrigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(choices=[('website', 'Website'), ('channel', 'Channel'), ('group', 'Group'), ('instagram', 'Instagram')], max_length=9)),
+                ('object_id', models.PositiveIntegerField()),
+                ('image', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('failed', 'Failed')], default='pending', max_length=7)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('id',),
+            },
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='thumbnail_ready',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='thumbnail_ready',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='instagram',
+            name='thumbnail_ready',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='linkindex',
+            name='thumbnail_ready',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='website',
+            name='thumbnail_ready',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='imagejob',
+            index=models.Index(fields=['status', 'id'], name='links_image_status_1bfa71_idx'),
+        ),
+        migrations.RunPython(mark_thumbnails_ready, migrations.RunPython.noop),
+    ]
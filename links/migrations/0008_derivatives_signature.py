@@ -0,0 +1,64 @@
+# Generated by Django 2.2.28 on 2026-10-18 10:18
+
+import os
+
+from django.db import migrations, models
+
+from links import derivatives
+
+
+def record_signatures(apps, schema_editor):
+    # links whose derivatives (by current settings) are all made keep
+    # showing them, others show the original image until they are made
+    ImageDerivative = apps.get_model('links', 'ImageDerivative')
+    for model_name in ('Website', 'Channel', 'Group', 'Instagram', 'LinkIndex'):
+        model = apps.get_model('links', model_name)
+        ready = (model.objects
+            .filter(thumbnail_ready=True)
+            .exclude(image_hash='')
+            .values_list('image', 'image_hash')
+            .distinct())
+        for image, image_hash in ready:
+            ext = os.path.splitext(image)[1]
+            keys = [derivatives.get_key(image_hash, width, format, ext)
+                for width, format in derivatives.get_variants()]
+            made = ImageDerivative.objects.filter(key__in=keys).count()
+            if made == len(keys):
+                model.objects.filter(image=image).update(
+                    derivatives_signature=derivatives.SIGNATURE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('links', '0007_imagederivative'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channel',
+            name='derivatives_signature',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='derivatives_signature',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='instagram',
+            name='derivatives_signature',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='linkindex',
+            name='derivatives_signature',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='website',
+            name='derivatives_signature',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.RunPython(record_signatures, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:58
+
+from django.db import migrations
+
+from links import derivatives
+
+
+def requeue_image_jobs(apps, schema_editor):
+    # derivatives of the old transform have other keys, links show the
+    # original image until `process_image_jobs` makes them again
+    ImageJob = apps.get_model('links', 'ImageJob')
+    for model_name in ('Website', 'Channel', 'Group', 'Instagram'):
+        model = apps.get_model('links', model_name)
+        links = (model.objects
+            .exclude(derivatives_signature='')
+            .exclude(derivatives_signature=derivatives.SIGNATURE)
+            .values_list('pk', 'image'))
+        ImageJob.objects.bulk_create(
+            ImageJob(model_name=model_name.lower(), object_id=pk, image=image)
+            for pk, image in links.iterator())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('links', '0008_derivatives_signature'),
+    ]
+
+    operations = [
+        migrations.RunPython(requeue_image_jobs, migrations.RunPython.noop),
+    ]
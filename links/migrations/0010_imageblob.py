@@ -0,0 +1,62 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:59
+
+from collections import Counter
+
+from django.db import migrations, models
+import links.models
+import links.storage
+
+
+def count_image_references(apps, schema_editor):
+    references = Counter()
+    for model_name in ('Website', 'Channel', 'Group', 'Instagram'):
+        model = apps.get_model('links', model_name)
+        images = (model.objects.exclude(image='')
+            .values_list('image')
+            .annotate(count=models.Count('id')))
+        for image, count in images:
+            references[image] += count
+    ImageBlob = apps.get_model('links', 'ImageBlob')
+    ImageBlob.objects.bulk_create(
+        [ImageBlob(file=image, references=count)
+            for image, count in references.items()],
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('links', '0009_requeue_image_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.CharField(max_length=255, unique=True)),
+                ('references', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='channel',
+            name='image',
+            field=models.ImageField(storage=links.storage.ContentAddressedStorage(), upload_to=links.models.image_upload_path, verbose_name='Image'),
+        ),
+        migrations.AlterField(
+            model_name='group',
+            name='image',
+            field=models.ImageField(storage=links.storage.ContentAddressedStorage(), upload_to=links.models.image_upload_path, verbose_name='Image'),
+        ),
+        migrations.AlterField(
+            model_name='instagram',
+            name='image',
+            field=models.ImageField(storage=links.storage.ContentAddressedStorage(), upload_to=links.models.image_upload_path, verbose_name='Image'),
+        ),
+        migrations.AlterField(
+            model_name='website',
+            name='image',
+            field=models.ImageField(storage=links.storage.ContentAddressedStorage(), upload_to=links.models.image_upload_path, verbose_name='Image'),
+        ),
+        migrations.RunPython(count_image_references, migrations.RunPython.noop),
+    ]
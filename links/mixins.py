@@ -1,6 +1,7 @@
 import re
 import os
 import datetime
+import hashlib
 
 from django.http import Http404
 from django.contrib.messages.views import SuccessMessageMixin
@@ -10,6 +11,7 @@ from django.urls import reverse_lazy
 from django.contrib import messages
 from django.core.exceptions import ValidationError
 from django.core.files import File
+from django.utils.cache import get_conditional_response, patch_vary_headers
 from django.contrib.contenttypes.models import ContentType
 from django.views.generic import (
     ListView,
@@ -20,6 +22,8 @@ from django.views.generic import (
     View,
 )
 
+from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError as drf_ValidationError
 from rest_framework.generics import (
 	ListAPIView,
 	RetrieveAPIView,
@@ -31,6 +35,8 @@ from rest_framework.generics import (
 )
 
 from . import utils
+from . import facets
+from .cache import get_catalogue_version
 
 
 class ApplicationMixIn(ListView):
@@ -51,7 +57,53 @@ class ApplicationMixIn(ListView):
             parent=None)
 
 
-class CreateMixIn(CreateView):
+class UploadGuardMixIn:
+    """
+    Report uploads that are rejected by `ImageUploadGuardHandler` (see
+    links.uploads) as errors of their form fields.
+    """
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        rejected = getattr(self.request, 'rejected_uploads', None)
+        if rejected:
+            form.full_clean()
+            for field, message in rejected.items():
+                # instead of "This field is required"
+                form.errors.pop(field, None)
+                form.add_error(field, message)
+        return form
+
+
+class UploadGuardAPIMixIn:
+    """API version of `UploadGuardMixIn`"""
+    def get_serializer(self, *args, **kwargs):
+        rejected = getattr(self.request, 'rejected_uploads', None)
+        if rejected and 'data' in kwargs:
+            raise drf_ValidationError({field: [message]
+                for field, message in rejected.items()})
+        return super().get_serializer(*args, **kwargs)
+
+
+class UploadGuardAdminMixIn:
+    """Admin version of `UploadGuardMixIn`"""
+    def get_form(self, request, obj=None, **kwargs):
+        form_class = super().get_form(request, obj, **kwargs)
+        rejected = getattr(request, 'rejected_uploads', None)
+        if not rejected:
+            return form_class
+
+        class UploadGuardForm(form_class):
+            def clean(self):
+                cleaned_data = super().clean()
+                for field, message in rejected.items():
+                    if field in self.fields:
+                        self.errors.pop(field, None)
+                        self.add_error(field, message)
+                return cleaned_data
+        return UploadGuardForm
+
+
+class CreateMixIn(UploadGuardMixIn, CreateView):
     def form_valid(self, form):
         """
         On validation set the author of the link,
@@ -68,7 +120,7 @@ class CreateMixIn(CreateView):
         return reverse_lazy('dashboard:index')
 
 
-class CreateAPIMixIn(CreateAPIView):
+class CreateAPIMixIn(UploadGuardAPIMixIn, CreateAPIView):
     def perform_create(self, serializer):
         url = serializer.validated_data.get('url')
         instance = serializer.save(author=self.request.user,
@@ -123,7 +175,7 @@ class OwnerMixin(UserPassesTestMixin):
         return (self.request.user == self.object.author)
 
 
-class UpdateMixIn(UpdateView):
+class UpdateMixIn(UploadGuardMixIn, UpdateView):
     def form_valid(self, form):
         cd = form.cleaned_data
         object = self.get_object()
@@ -142,7 +194,7 @@ class UpdateMixIn(UpdateView):
         return utils.get_parent_or_child_object(self)
 
 
-class RetrieveUpdateAPIMixIn(RetrieveUpdateAPIView):
+class RetrieveUpdateAPIMixIn(UploadGuardAPIMixIn, RetrieveUpdateAPIView):
     def perform_update(self, serializer):
         obj = self.get_object()
         data = serializer.validated_data
@@ -173,20 +225,14 @@ class DeleteMixIn(LoginRequiredMixin, OwnerMixin, DeleteView):
         obj = self.model.objects.get(slug=slug, parent=None)
         return obj
 
-    # send flash message and do the rest (deleting the thumbnail then the link)
+    # send flash message and do the rest (images are released when links
+    # are deleted, see ImageBlob)
     def post(self, request, *args, **kwargs):
-        obj = self.get_object()
-        utils.delete_images(obj)
         messages.success(request, self.success_message)
         return super().post(request, *args, **kwargs)
 
 
 class DeleteAPIMixIn(DestroyAPIView):
-    def perform_destroy(self, instance):
-        obj = self.get_object()
-        utils.delete_images(obj)
-        super().perform_destroy(instance)
-
     def get_object(self):
         slug = self.kwargs.get('slug')
         obj = self.model.objects.get(slug=slug, parent=None)
@@ -263,17 +309,111 @@ class FilterByApplicationMixIn:
         return queryset
 
 
+class FacetMixIn:
+    """
+    Filter index entries by facets (`model`, `app`, `type` and `category`
+    query parameters) and add number of results per facet value
+    to the paginated response.
+    """
+
+    def filter_queryset(self, queryset):
+        # facets are counted before their own filters are applied
+        self.facet_queryset = super().filter_queryset(queryset)
+        return facets.filter_by_facets(self.facet_queryset, self.request.GET)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['facets'] = facets.get_facets(self.facet_queryset,
+            self.request.GET)
+        return response
+
+
 class PaginateMixIn:
+    """
+    Paginate queryset in database, then serialize only objects of the page.
+    `serializer_class` property must be set in the sub class.
+    """
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+        queryset = self.filter_queryset(self.get_queryset())
         page = self.paginate_queryset(queryset)
         if page is not None:
-            return self.get_paginated_response(page)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
 
+        serializer = self.get_serializer(queryset, many=True)
         result = {
-            'links': queryset,
+            'links': serializer.data,
         }
         return Response(result)
+
+
+class ConditionalGetMixIn:
+    """
+    Answer GET requests of unchanged resources with `304 Not Modified`
+    before anything is serialized.
+
+    ETag is made of the catalogue version (changed whenever a published
+    link or category changes), the requested URL and the negotiated media
+    type (eg. JSON or the browsable API), so checking it needs no database
+    query.
+    Views that override `get` should call `get_not_modified_response`.
+    """
+
+    def get_etag_parts(self, request):
+        return [
+            get_catalogue_version(),
+            request.scheme,
+            request.get_host(),
+            request.get_full_path(),
+            request.accepted_media_type,
+        ]
+
+    def get_etag(self, request):
+        data = ':'.join(str(part) for part in self.get_etag_parts(request))
+        return f'"{hashlib.md5(data.encode()).hexdigest()}"'
+
+    def get_not_modified_response(self, request):
+        """Return 304 response if client has the current version, else None"""
+        self.etag = self.get_etag(request)
+        return get_conditional_response(request, etag=self.etag)
+
+    def get(self, request, *args, **kwargs):
+        response = self.get_not_modified_response(request)
+        if response is not None:
+            return response
+        return super().get(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args,
+            **kwargs)
+        etag = getattr(self, 'etag', None)
+        if etag is not None and response.status_code in (200, 304):
+            response['ETag'] = etag
+        # representation depends on the Accept header
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+
+class ConditionalRetrieveMixIn(ConditionalGetMixIn):
+    """
+    Same as ConditionalGetMixIn for detail views, ETag also depends on the
+    object (owners can see their unpublished changes) and the user.
+    """
+
+    def get_object(self):
+        # object is needed for ETag and then for the response
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+    def get_etag_parts(self, request):
+        obj = self.get_object()
+        return super().get_etag_parts(request) + [
+            obj.model_name,
+            obj.pk,
+            obj.updated.isoformat(),
+            request.user.pk,
+        ]
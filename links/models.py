@@ -1,7 +1,8 @@
 import uuid
 import os
+from datetime import timedelta
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.db import models, IntegrityError, transaction
 from django.core.exceptions import ValidationError
@@ -9,8 +10,6 @@ from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 from django.utils import timezone
 from django.utils.text import slugify
-from django.urls import reverse
-from django.utils.translation import activate
 from django.contrib.contenttypes.fields import (
     GenericForeignKey,
     GenericRelation
@@ -18,9 +17,16 @@ from django.contrib.contenttypes.fields import (
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from taggit.managers import TaggableManager
+from taggit.models import Tag, TaggedItem
 
-from dashboard.models import Action
+from dashboard.models import Action, UserStatistics
 from . import utils
+from . import search
+from . import derivatives
+from .cache import bump_catalogue_version
+from .storage import image_storage
+from .suggest import suggestions
+from .urlbuilder import url_builder
 
 
 User = get_user_model()
@@ -33,16 +39,32 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # saved name, a renamed category replaces it in suggestions
+        instance._loaded_name = instance.__dict__.get('name')
+        return instance
+
+    _loaded_name = None
+
     class Meta:
         verbose_name_plural = _('Categories')
         ordering = ('order', 'name')
 
 
 def image_upload_path(instance, filename):
-    # define directory name
-    # websites, channels, groups, instagrams
-    directory = instance.__class__.__name__.lower() + 's'
-    return 'images/{}/{}'.format(directory, filename)
+    # images are named by their contents (hash is set in `Link.save`), so
+    # identical images are stored once
+    ext = os.path.splitext(filename)[1].lower()
+    image_hash = instance.image_hash
+    return 'images/{}/{}{}'.format(image_hash[:2], image_hash, ext)
+
+
+# size, dominant colour and blurred placeholder of images, set with their
+# derivatives (see `links.derivatives.describe`)
+IMAGE_INFO_FIELDS = ('image_width', 'image_height', 'image_color',
+    'image_placeholder')
 
 
 class PublishedManager(models.Manager):
@@ -50,7 +72,78 @@ class PublishedManager(models.Manager):
         return super().get_queryset().filter(status='published', parent=None)
 
 
-class Link(models.Model):
+class ImageDerivativesMixIn:
+    """
+    URLs of derivatives of `image`, made when `thumbnail_ready` is set
+    (see links.derivatives).
+    """
+    @property
+    def has_derivatives(self):
+        # images saved before derivatives have a scaled image (in place)
+        # and a thumbnail only, derivatives made with other settings may
+        # not exist anymore
+        return self.thumbnail_ready and bool(self.image_hash) and \
+            self.derivatives_signature == derivatives.SIGNATURE
+
+    def get_image_url(self, width, format=''):
+        return derivatives.get_url(self.image.name, self.image_hash, width,
+            format)
+
+    @property
+    def scaled_url(self):
+        """Get scaled image url (original image until it is made)"""
+        if self.has_derivatives:
+            return self.get_image_url(derivatives.SCALED_WIDTH)
+        return self.image.url
+
+    @property
+    def thumbnail_url(self):
+        """Get thumbnail url (original image until thumbnail is made)"""
+        if self.has_derivatives:
+            return self.get_image_url(derivatives.THUMBNAIL_WIDTH)
+        if self.thumbnail_ready and not self.image_hash:
+            image_url, ext = os.path.splitext(self.image.url)
+            return image_url + '_thumbnail' + ext
+        return self.image.url
+
+    def get_srcset(self, format=''):
+        """`srcset` of all widths of the format, '' until they are made"""
+        if not self.has_derivatives:
+            return ''
+        return derivatives.get_srcset(self.image.name, self.image_hash,
+            format)
+
+    def get_image_size(self, width):
+        """Size of the derivative of `width`, None until image is described"""
+        if not self.image_width or not self.image_height:
+            return None
+        box_width, box_height = derivatives.get_size(width)
+        scale = min(box_width / self.image_width,
+            box_height / self.image_height, 1)
+        return (max(round(self.image_width * scale), 1),
+            max(round(self.image_height * scale), 1))
+
+    @property
+    def placeholder_style(self):
+        """Inline style that shows colour and placeholder until image loads"""
+        if not self.image_placeholder:
+            return ''
+        return (f'background: {self.image_color} '
+            f'url({self.image_placeholder}) center / cover no-repeat;')
+
+    @property
+    def image_variants(self):
+        """url, width and type of all derivatives"""
+        if not self.has_derivatives:
+            return []
+        return [{
+            'url': self.get_image_url(width, format),
+            'width': width,
+            'type': derivatives.get_type(self.image.name, format),
+        } for width, format in derivatives.get_variants()]
+
+
+class Link(ImageDerivativesMixIn, models.Model):
     STATUS_CHOICES = (
         ('draft', _('Draft')),
         ('published', _('Published')),
@@ -74,8 +167,21 @@ class Link(models.Model):
     description = models.TextField(max_length=500,
         verbose_name=_('Description'),
         help_text=_("Link's description up to 500 characters"))
+    # files are shared by links with identical images and removed when no
+    # link references them (see ImageBlob)
     image = models.ImageField(upload_to=image_upload_path,
-        verbose_name=_('Image'))
+        storage=image_storage, verbose_name=_('Image'))
+    # sha256 of image contents, derivatives (scaled image and thumbnail)
+    # are named by it and made by `process_image_jobs` command
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)
+    thumbnail_ready = models.BooleanField(default=False, editable=False)
+    # `links.derivatives.SIGNATURE` when derivatives were made
+    derivatives_signature = models.CharField(max_length=16, blank=True,
+        editable=False)
+    image_width = models.PositiveIntegerField(null=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, editable=False)
+    image_color = models.CharField(max_length=7, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)
     created = models.DateTimeField(default=timezone.localtime)
     updated = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES,
@@ -85,18 +191,6 @@ class Link(models.Model):
     tags = TaggableManager()
     actions = GenericRelation(Action)
 
-    @property
-    def thumbnail_url(self):
-        """Get thumbnail url"""
-        image_url, ext = os.path.splitext(self.image.url)
-        return image_url + '_thumbnail' + ext
-
-    @property
-    def thumbnail_path(self):
-        """Get thumbnail path"""
-        image_path, ext = os.path.splitext(self.image.path)
-        return image_path + '_thumbnail' + ext
-
     def get_object_url(self, action='detail'):
         """
         Generate URL for detail, update, and delete object.
@@ -104,10 +198,8 @@ class Link(models.Model):
         """
         ACTIONS = ['detail', 'update', 'delete']
         if action in ACTIONS:
-            slug = self.slug
-            model = self.__class__.__name__.lower()
-            url_reverse = f'links:{model}-{action}'
-            return reverse(url_reverse, kwargs={'slug': slug})
+            view_name = f'links:{self.model_name}-{action}'
+            return url_builder.build(view_name, self.slug, 'slug')
         raise ValueError(f"action must be one of {ACTIONS}")
 
     def get_absolute_url(self):
@@ -120,9 +212,8 @@ class Link(models.Model):
         return self.get_object_url(action='delete')
 
     def get_admin_url(self):
-        model_name = self.__class__.__name__.lower()
-        activate('en')
-        return reverse(f"admin:links_{model_name}_change", args=(self.id,))
+        return url_builder.build(f'admin:links_{self.model_name}_change',
+            self.id, language='en')
 
     @property
     def child(self):
@@ -143,6 +234,32 @@ class Link(models.Model):
     def model_name(self):
         return self.__class__.__name__.lower()
 
+    @property
+    def counted_author_id(self):
+        """Author whose statistics count this link (parents only)"""
+        if self.parent_id is None:
+            return self.author_id
+        return None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # saved value, to know how statistics of authors change
+        if 'parent_id' in field_names and 'author_id' in field_names:
+            instance._loaded_counted_author_id = instance.counted_author_id
+        # saved image, derivatives are made and references are counted
+        # only when image changes
+        instance._loaded_image_name = instance.__dict__.get('image')
+        instance._loaded_image_hash = instance.__dict__.get('image_hash')
+        return instance
+
+    _loaded_image_name = None
+    _loaded_image_hash = None
+
+    def image_changed(self):
+        return not self.image._committed or \
+            self.image.name != self._loaded_image_name
+
     # NOTE: exceptions in save method will be risen only in web-bse views
     # for api views we need to raise specific exceptions
     def save(self, *args, **kwargs):
@@ -153,10 +270,6 @@ class Link(models.Model):
             if action:
                 utils.hide_action(action)
 
-            # save parent image and thumbnail path
-            old_image_path = self.parent.image.path
-            old_thumbnail_path = self.parent.thumbnail_path
-
             parent = self.parent
             # make parent and child equal
             fields = [f.name for f in self._meta.fields]
@@ -169,12 +282,6 @@ class Link(models.Model):
                 setattr(parent, field, attr_self_val)
             parent.save()
 
-            # if parent and child are not pointing to old images, remove them
-            if self.image.path != old_image_path and \
-                self.parent.image.path != old_image_path:
-                os.remove(old_image_path)
-                os.remove(old_thumbnail_path)
-
         # set slug filed
         model_name = self.__class__.__name__.lower()
         if model_name == 'website':
@@ -193,9 +300,47 @@ class Link(models.Model):
             self.slug = slugify(f'ig-{self.page_id}')
             self.url = utils.generate_instagram_url(self.page_id)
 
-        super().save(*args, **kwargs)
-        utils.scale_image(self.image.path)
-        utils.create_thumbnail(self.image.path, self.thumbnail_path)
+        # an unchanged image costs nothing, a new upload is hashed, and
+        # derivatives are made only if they were not made for its contents
+        adding = self.pk is None
+        image_changed = self.image_changed()
+        # images of other links (eg. of parent or child) come with their
+        # hash
+        if image_changed and (not self.image._committed or
+                not self.image_hash):
+            self.image_hash = derivatives.get_file_hash(self.image)
+            # described again when derivatives are made
+            self.image_width = self.image_height = None
+            self.image_color = self.image_placeholder = ''
+        image_name = self.image.name
+        if not self.image._committed:
+            # name the upload is stored by
+            image_name = self.image.field.generate_filename(self, image_name)
+        old_image_name = None if adding else self._loaded_image_name
+        old_image_hash = None if adding else self._loaded_image_hash
+
+        # statistics of the author, image job and image references are
+        # saved in the same transaction
+        with transaction.atomic():
+            # the reference is counted before the file is written and its
+            # derivatives are looked up, so removal of the same contents
+            # (see `ImageBlobManager.remove`) either sees it or is done
+            # before
+            if image_name != old_image_name:
+                ImageBlob.objects.retain(image_name)
+            if image_changed:
+                self.thumbnail_ready = self.image_width is not None and \
+                    ImageDerivative.objects.is_complete(self.image_hash,
+                        image_name)
+                self.derivatives_signature = derivatives.SIGNATURE \
+                    if self.thumbnail_ready else ''
+            super().save(*args, **kwargs)
+            if not self.thumbnail_ready and image_changed:
+                ImageJob.objects.enqueue(self)
+            if image_name != old_image_name and old_image_name:
+                ImageBlob.objects.release(old_image_name, old_image_hash)
+        self._loaded_image_name = self.image.name
+        self._loaded_image_hash = self.image_hash
 
         # if object is parent and is published, hide created action
         if not self.parent and self.status == 'published':
@@ -203,6 +348,9 @@ class Link(models.Model):
             if action:
                 utils.hide_action(action)
 
+        # keep catalogue-wide index in sync with parent objects
+        LinkIndex.objects.sync(self)
+
 
     # Managers
     objects = models.Manager()
@@ -235,6 +383,7 @@ class Website(Link):
 
     class Meta:
         ordering = ('-created',)
+        indexes = [models.Index(fields=['-created', '-id'])]
 
 
 class Channel(Link):
@@ -270,6 +419,7 @@ class Channel(Link):
 
     class Meta:
         ordering = ('-created',)
+        indexes = [models.Index(fields=['-created', '-id'])]
 
 
 class Group(Link):
@@ -301,6 +451,7 @@ class Group(Link):
 
     class Meta:
         ordering = ('-created',)
+        indexes = [models.Index(fields=['-created', '-id'])]
 
 
 class Instagram(Link):
@@ -323,6 +474,490 @@ class Instagram(Link):
 
     class Meta:
         ordering = ('-created',)
+        indexes = [models.Index(fields=['-created', '-id'])]
+
+
+class LinkIndexManager(models.Manager):
+    def sync(self, link):
+        """
+        Create, update or remove index entry of the given parent link.
+        Only published parent links are indexed.
+        """
+        # entries of links that became children are removed
+        if link.parent_id is not None or link.status != 'published':
+            self.remove(link)
+            return
+
+        old_entry = self.filter(model_name=link.model_name,
+            object_id=link.id).first()
+        old_title = None
+        old_tags = []
+        if old_entry:
+            old_title = old_entry.title
+            old_tags = list(old_entry.tags.values_list('name', flat=True))
+        entry, created = self.update_or_create(
+            model_name=link.model_name,
+            object_id=link.id,
+            defaults={
+                'title': link.title,
+                'slug': link.slug,
+                'description': link.description,
+                'image': link.image.name,
+                'application': getattr(link, 'application', ''),
+                'type': getattr(link, 'type', ''),
+                'category_id': link.category_id,
+                'status': link.status,
+                'created': link.created,
+                'image_hash': link.image_hash,
+                'thumbnail_ready': link.thumbnail_ready,
+                'derivatives_signature': link.derivatives_signature,
+                **{field: getattr(link, field) for field in IMAGE_INFO_FIELDS},
+            })
+        tags = link.tags.all()
+        entry.tags.set(tags)
+        SearchPosting.objects.index(entry)
+        SearchTrigram.objects.index(entry, search.get_fuzzy_text(link))
+        suggestions.replace(old_title, entry.title, 'link')
+        suggestions.update(old_tags, [tag.name for tag in tags], 'tag')
+        bump_catalogue_version()
+        return entry
+
+    def sync_tags(self, link):
+        """Copy tags of the given link to its index entry (if any)"""
+        entry = self.filter(model_name=link.model_name,
+            object_id=link.id).first()
+        if entry:
+            old_tags = list(entry.tags.values_list('name', flat=True))
+            tags = link.tags.all()
+            entry.tags.set(tags)
+            suggestions.update(old_tags, [tag.name for tag in tags], 'tag')
+            bump_catalogue_version()
+
+    def remove(self, link):
+        entries = self.filter(model_name=link.model_name, object_id=link.id)
+        titles = list(entries.values_list('title', flat=True))
+        tags = list(LinkIndex.tags.through.objects
+            .filter(linkindex__in=entries)
+            .values_list('tag__name', flat=True))
+        suggestions.update(titles, [], 'link')
+        suggestions.update(tags, [], 'tag')
+        if titles:
+            entries.delete()
+            bump_catalogue_version()
+
+
+class LinkIndex(ImageDerivativesMixIn, models.Model):
+    """
+    Denormalized index of all published parent links.
+    Catalogue-wide pages (search, tags, categories) query this table
+    instead of querying websites, channels, groups and instagrams one by one.
+    """
+    MODEL_CHOICES = (
+        ('website', _('Website')),
+        ('channel', _('Channel')),
+        ('group', _('Group')),
+        ('instagram', _('Instagram')),
+    )
+
+    model_name = models.CharField(max_length=9, choices=MODEL_CHOICES)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=60)
+    slug = models.SlugField(max_length=60)
+    description = models.TextField(max_length=500)
+    # name of the link's image file, files are managed by the link itself
+    image = models.ImageField()
+    # channels and groups only
+    application = models.CharField(max_length=8, blank=True)
+    # websites only
+    type = models.CharField(max_length=7, blank=True)
+    category = models.ForeignKey(Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+')
+    tags = models.ManyToManyField(Tag, related_name='+')
+    status = models.CharField(max_length=10, choices=Link.STATUS_CHOICES)
+    created = models.DateTimeField()
+    updated = models.DateTimeField(auto_now=True)
+    # weighted number of terms (document length), used for ranking
+    term_count = models.PositiveIntegerField(default=0)
+    # number of trigrams, used for fuzzy search
+    trigram_count = models.PositiveIntegerField(default=0)
+    image_hash = models.CharField(max_length=64, blank=True)
+    thumbnail_ready = models.BooleanField(default=False)
+    derivatives_signature = models.CharField(max_length=16, blank=True)
+    image_width = models.PositiveIntegerField(null=True)
+    image_height = models.PositiveIntegerField(null=True)
+    image_color = models.CharField(max_length=7, blank=True)
+    image_placeholder = models.TextField(blank=True)
+
+    objects = LinkIndexManager()
+
+    class Meta:
+        ordering = ('-created', '-id')
+        unique_together = ('model_name', 'object_id')
+        indexes = [
+            models.Index(fields=['-created', '-id']),
+            models.Index(fields=['category', '-created']),
+        ]
+
+    def __str__(self):
+        return f'{self.title} ({self.model_name})'
+
+
+    def get_absolute_url(self):
+        return url_builder.build(f'links:{self.model_name}-detail',
+            self.slug, 'slug')
+
+
+class SearchPostingManager(models.Manager):
+    def index(self, entry):
+        """Replace search terms of the given index entry"""
+        frequencies = search.get_term_frequencies(entry)
+        self.filter(entry=entry).delete()
+        self.bulk_create([
+            SearchPosting(entry=entry, term=term, frequency=frequency)
+            for term, frequency in frequencies.items()
+        ])
+        term_count = sum(frequencies.values())
+        LinkIndex.objects.filter(pk=entry.pk).update(term_count=term_count)
+        entry.term_count = term_count
+
+
+class SearchPosting(models.Model):
+    """
+    Inverted index of published links.
+    Each row stores how many times (weighted) a normalized term appears
+    in an index entry.
+    """
+    entry = models.ForeignKey(LinkIndex,
+        on_delete=models.CASCADE,
+        related_name='postings')
+    term = models.CharField(max_length=search.MAX_TERM_LENGTH)
+    frequency = models.PositiveIntegerField()
+
+    objects = SearchPostingManager()
+
+    class Meta:
+        # not unique, MySQL collations may consider different terms equal
+        indexes = [models.Index(fields=['term', 'entry'])]
+
+    def __str__(self):
+        return f'{self.term} ({self.frequency})'
+
+
+class SearchTrigramManager(models.Manager):
+    def index(self, entry, text):
+        """Replace trigrams of the given index entry"""
+        trigrams = search.get_trigrams(text)
+        self.filter(entry=entry).delete()
+        self.bulk_create([
+            SearchTrigram(entry=entry, trigram=trigram)
+            for trigram in trigrams
+        ])
+        LinkIndex.objects.filter(pk=entry.pk).update(
+            trigram_count=len(trigrams))
+        entry.trigram_count = len(trigrams)
+
+
+class SearchTrigram(models.Model):
+    """
+    Trigrams of title, channel id, page id and domain of published links,
+    used for typo-tolerant (fuzzy) search.
+    """
+    entry = models.ForeignKey(LinkIndex,
+        on_delete=models.CASCADE,
+        related_name='trigrams')
+    trigram = models.CharField(max_length=3)
+
+    objects = SearchTrigramManager()
+
+    class Meta:
+        indexes = [models.Index(fields=['trigram', 'entry'])]
+
+    def __str__(self):
+        return self.trigram
+
+
+class ImageJobManager(models.Manager):
+    def enqueue(self, link):
+        return self.create(model_name=link.model_name, object_id=link.pk,
+            image=link.image.name)
+
+    def claim(self):
+        """
+        Mark the oldest pending job as running and return it, None if there
+        is no pending job. Safe to call from several workers.
+        """
+        pending = self.filter(status='pending').order_by('id')
+        for job in pending[:10]:
+            claimed = self.filter(pk=job.pk, status='pending').update(
+                status='running',
+                attempts=models.F('attempts') + 1,
+                updated=timezone.now())
+            if claimed:
+                job.refresh_from_db()
+                return job
+        return None
+
+    def requeue_stale(self, seconds):
+        """Requeue jobs of workers that died while running them"""
+        stale = timezone.now() - timedelta(seconds=seconds)
+        return self.filter(status='running', updated__lt=stale).update(
+            status='pending', updated=timezone.now())
+
+
+class ImageJob(models.Model):
+    """
+    Scaled image and thumbnail that should be made for a link image.
+    Jobs are saved with the link (in the same transaction) and done by
+    `process_image_jobs` command, so requests don't wait for them.
+    """
+    STATUS_CHOICES = (
+        ('pending', _('Pending')),
+        ('running', _('Running')),
+        ('failed', _('Failed')),
+    )
+    MAX_ATTEMPTS = 3
+
+    model_name = models.CharField(max_length=9,
+        choices=LinkIndex.MODEL_CHOICES)
+    object_id = models.PositiveIntegerField()
+    # image of the link when job was queued
+    image = models.CharField(max_length=255)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES,
+        default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    # Managers
+    objects = ImageJobManager()
+
+    class Meta:
+        ordering = ('id',)
+        indexes = [models.Index(fields=['status', 'id'])]
+
+    def __str__(self):
+        return f'{self.model_name} {self.object_id}: {self.image}'
+
+    def fail(self, error):
+        """Record error, job is retried up to MAX_ATTEMPTS times"""
+        self.error = error
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.status = 'failed'
+        else:
+            self.status = 'pending'
+        self.save()
+
+
+class ImageDerivativeManager(models.Manager):
+    def get_keys(self, image_hash, image_name):
+        """Keys of all derivatives of the image and their (width, format)"""
+        ext = os.path.splitext(image_name)[1]
+        return {derivatives.get_key(image_hash, width, format, ext):
+            (width, format) for width, format in derivatives.get_variants()}
+
+    def is_complete(self, image_hash, image_name):
+        """Whether all derivatives of the image contents are made"""
+        keys = self.get_keys(image_hash, image_name)
+        return self.filter(key__in=keys).count() == len(keys)
+
+    def make(self, image_hash, image_path):
+        """
+        Make derivatives of the image that are not made yet, return its
+        description (values of `IMAGE_INFO_FIELDS`).
+        """
+        keys = self.get_keys(image_hash, image_path)
+        made = set(self.filter(key__in=keys).values_list('key', flat=True))
+        missing = {key: variant for key, variant in keys.items()
+            if key not in made}
+        file_names, info = derivatives.make_all(image_path, missing)
+        for key, (width, format) in missing.items():
+            self.get_or_create(key=key, defaults={
+                'image_hash': image_hash,
+                'name': derivatives.get_variant_name(width, format),
+                'file': file_names[key],
+            })
+        return info
+
+    def remove_stale(self, batch_size=1000):
+        """
+        Remove derivatives made by older settings (widths, formats, quality
+        or transform version), files are removed after commit. Return
+        number of removed derivatives.
+        """
+        stale = []
+        rows = self.values_list('pk', 'key', 'image_hash', 'name', 'file')
+        for pk, key, image_hash, name, file_name in rows.iterator():
+            if not derivatives.is_current(key, image_hash, name, file_name):
+                stale.append((pk, file_name))
+        for i in range(0, len(stale), batch_size):
+            batch = stale[i:i + batch_size]
+            file_names = [file_name for pk, file_name in batch]
+            with transaction.atomic():
+                self.filter(pk__in=[pk for pk, file_name in batch]).delete()
+                transaction.on_commit(
+                    lambda file_names=file_names: derivatives.remove(
+                        file_names))
+        return len(stale)
+
+    def remove_unused(self, image_hash):
+        """
+        Remove derivatives of the image contents once no link uses them,
+        files are removed after commit.
+        """
+        for model in (Website, Channel, Group, Instagram):
+            if model.objects.filter(image_hash=image_hash).exists():
+                return
+        unused = self.filter(image_hash=image_hash)
+        file_names = list(unused.values_list('file', flat=True))
+        unused.delete()
+        transaction.on_commit(lambda: derivatives.remove(file_names))
+
+
+class ImageBlobManager(models.Manager):
+    def retain(self, file):
+        """Count a new reference to the image file"""
+        references = models.F('references') + 1
+        if self.filter(file=file).update(references=references):
+            return
+        try:
+            with transaction.atomic():
+                self.create(file=file, references=1)
+        except IntegrityError:
+            # created by a concurrent save
+            self.filter(file=file).update(references=references)
+
+    def release(self, file, image_hash):
+        """
+        Remove a reference to the image file. Once no link references it,
+        the file is removed after commit (see `remove`).
+        """
+        self.filter(file=file, references__gt=0).update(
+            references=models.F('references') - 1)
+        if self.filter(file=file, references=0).exists():
+            transaction.on_commit(lambda: self.remove(file, image_hash))
+
+    def remove(self, file, image_hash):
+        """
+        Remove the image file (and its derivatives, if no link uses them)
+        if it is still unreferenced.
+
+        The blob is locked while its file is removed, and `retain` counts
+        a new reference before the file is written (see `Link.save`), so
+        an identical upload either keeps the file or waits for the removal
+        and writes the file again.
+        """
+        with transaction.atomic():
+            blobs = self.select_for_update().filter(file=file,
+                references=0)
+            if not list(blobs.values_list('pk', flat=True)):
+                # referenced again
+                return
+            path = image_storage.path(file)
+            # thumbnail made before derivatives
+            thumbnail_path = '{}_thumbnail{}'.format(*os.path.splitext(path))
+            utils.remove_files(path, thumbnail_path)
+            blobs.delete()
+            if image_hash:
+                ImageDerivative.objects.remove_unused(image_hash)
+
+
+class ImageBlob(models.Model):
+    """
+    Image file of links and number of links (parents and children) that
+    reference it. Children, publishing and deleting links only change
+    references, files are removed when they are not referenced.
+    """
+    file = models.CharField(max_length=255, unique=True)
+    references = models.PositiveIntegerField(default=0)
+
+    # Managers
+    objects = ImageBlobManager()
+
+    def __str__(self):
+        return self.file
+
+
+class ImageDerivative(models.Model):
+    """
+    Derivative file made from image contents, `key` is a hash of contents
+    and transform parameters (see links.derivatives). Links with identical
+    images share derivatives, and a changed image that was seen before is
+    not processed again.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    image_hash = models.CharField(max_length=64, db_index=True)
+    name = models.CharField(max_length=20)
+    file = models.CharField(max_length=255)
+    created = models.DateTimeField(auto_now_add=True)
+
+    # Managers
+    objects = ImageDerivativeManager()
+
+    def __str__(self):
+        return self.file
+
+
+@receiver(post_delete)
+def remove_link_index(sender, instance, **kwargs):
+    if isinstance(instance, Link) and instance.parent_id is None:
+        LinkIndex.objects.remove(instance)
+
+
+@receiver(post_delete)
+def release_link_image(sender, instance, **kwargs):
+    if isinstance(instance, Link) and instance.image.name:
+        ImageBlob.objects.release(instance.image.name, instance.image_hash)
+
+
+@receiver(post_save)
+def update_user_statistics(sender, instance, created, **kwargs):
+    if not isinstance(instance, Link):
+        return
+    author_id = instance.counted_author_id
+    if created:
+        old_author_id = None
+    else:
+        old_author_id = getattr(instance, '_loaded_counted_author_id',
+            author_id)
+    if old_author_id != author_id:
+        field = f'{instance.model_name}s_count'
+        if old_author_id is not None:
+            UserStatistics.objects.increment(old_author_id, field, -1)
+        if author_id is not None:
+            UserStatistics.objects.increment(author_id, field)
+    instance._loaded_counted_author_id = author_id
+
+
+@receiver(post_delete)
+def decrement_user_statistics(sender, instance, **kwargs):
+    if isinstance(instance, Link) and instance.parent_id is None:
+        UserStatistics.objects.increment(instance.author_id,
+            f'{instance.model_name}s_count', -1)
+
+
+@receiver(post_save, sender=Category)
+def update_category_caches(sender, instance, created, **kwargs):
+    old_name = None if created else instance._loaded_name
+    suggestions.replace(old_name, instance.name, 'category')
+    instance._loaded_name = instance.name
+    bump_catalogue_version()
+
+
+@receiver(post_delete, sender=Category)
+def remove_category_caches(sender, instance, **kwargs):
+    suggestions.remove(instance.name, 'category')
+    bump_catalogue_version()
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def update_link_index_tags(sender, instance, action, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, Link) and instance.parent_id is None:
+        LinkIndex.objects.sync_tags(instance)
 
 
 class Report(models.Model):
@@ -365,6 +1000,5 @@ class Report(models.Model):
         return self.__class__.__name__.lower()
 
     def get_admin_url(self):
-        model_name = self.model_name
-        activate('en')
-        return reverse(f"admin:links_{model_name}_change", args=(self.id,))
+        return url_builder.build(f'admin:links_{self.model_name}_change',
+            self.id, language='en')
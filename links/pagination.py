@@ -0,0 +1,132 @@
+import base64
+import heapq
+import json
+from itertools import islice
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(values):
+    """Encode a list of json serializable values as an opaque cursor"""
+    data = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor made by `encode_cursor`.
+    Raise ValueError if cursor is invalid.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor.encode())
+        values = json.loads(data.decode())
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+class MergePaginator:
+    """
+    Paginate links of several models as if they were in one table.
+
+    Every queryset is ordered by `field` (descending) and only
+    `per_page + 1` rows are fetched from each of them, these rows are then
+    k-way merged. Instead of page numbers an opaque cursor pointing to the
+    last link of the page is used to get the next page, so the cost of
+    a page does not depend on its position.
+
+    Ties are broken by model name and primary key, so every link has
+    a unique position.
+    """
+
+    def __init__(self, querysets, per_page, field='created'):
+        self.querysets = querysets
+        self.per_page = per_page
+        self.field = field
+
+    def sort_key(self, obj):
+        return (getattr(obj, self.field), obj.model_name, obj.pk)
+
+    def encode(self, obj):
+        value, model_name, pk = self.sort_key(obj)
+        return encode_cursor([value.isoformat(), model_name, pk])
+
+    def decode(self, cursor):
+        values = decode_cursor(cursor)
+        try:
+            value, model_name, pk = values
+            value = parse_datetime(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError('Invalid cursor') from e
+        if value is None or not isinstance(model_name, str) or \
+            not isinstance(pk, int):
+            raise ValueError('Invalid cursor')
+        return value, model_name, pk
+
+    def filter_after(self, queryset, position):
+        """Filter rows of queryset that come after `position`"""
+        value, model_name, pk = position
+        after = Q(**{f'{self.field}__lt': value})
+        current_model = queryset.model.__name__.lower()
+        if current_model == model_name:
+            after |= Q(**{self.field: value, 'pk__lt': pk})
+        elif current_model < model_name:
+            after |= Q(**{self.field: value})
+        return queryset.filter(after)
+
+    def merge(self, querysets, limit):
+        """Merge the first `limit` rows of each ordered queryset"""
+        ordering = (f'-{self.field}', '-pk')
+        rows = [list(queryset.order_by(*ordering)[:limit])
+            for queryset in querysets]
+        return heapq.merge(*rows, key=self.sort_key, reverse=True)
+
+    def page(self, cursor=None):
+        """
+        Return links of the page after `cursor` (first page if cursor is
+        None) and the cursor of the next page (None on the last page).
+        Raise ValueError if cursor is invalid.
+        """
+        querysets = self.querysets
+        if cursor:
+            position = self.decode(cursor)
+            querysets = [self.filter_after(queryset, position)
+                for queryset in querysets]
+
+        merged = self.merge(querysets, self.per_page + 1)
+        object_list = []
+        for obj in merged:
+            if len(object_list) == self.per_page:
+                return object_list, self.encode(object_list[-1])
+            object_list.append(obj)
+        return object_list, None
+
+
+class MergedQuerySets:
+    """
+    Links of several models as one sequence ordered by `field` (latest
+    first), for page number pagination (`django.core.paginator.Paginator`).
+
+    A slice fetches only the rows up to its end from each queryset and
+    merges them (see `MergePaginator`), the count is the sum of counts.
+    """
+
+    def __init__(self, querysets, field='created'):
+        self.querysets = querysets
+        self.paginator = MergePaginator(querysets, None, field)
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        merged = self.paginator.merge(self.querysets, index.stop)
+        return list(islice(merged, start, index.stop))
@@ -0,0 +1,71 @@
+import threading
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+
+
+# models that have actions or reports (model name must be unique)
+MODELS = (
+    'links.Website',
+    'links.Channel',
+    'links.Group',
+    'links.Instagram',
+    'links.Report',
+    'contact.ContactUs',
+)
+LINK_MODELS = ('website', 'channel', 'group', 'instagram')
+
+
+class ContentTypeRegistry:
+    """
+    Process-wide map of model names (eg. `website`) to model classes and
+    content types.
+
+    All content types are fetched with a single query the first time the
+    registry is used, then they are kept for the life of the process
+    (content types of existing models never change).
+    """
+
+    def __init__(self, labels=MODELS):
+        self.labels = labels
+        self.lock = threading.Lock()
+        self.models = None
+        self.content_types = None
+
+    def load(self):
+        models = {}
+        for label in self.labels:
+            model = apps.get_model(label)
+            models[model._meta.model_name] = model
+        content_types = ContentType.objects.get_for_models(*models.values())
+        with self.lock:
+            self.models = models
+            self.content_types = {model._meta.model_name: content_type
+                for model, content_type in content_types.items()}
+
+    def get_model(self, model_name):
+        """Raise LookupError if model is not registered"""
+        if self.models is None:
+            self.load()
+        try:
+            return self.models[model_name]
+        except KeyError:
+            raise LookupError(f'Model {model_name!r} is not registered')
+
+    def get_link_model(self, model_name):
+        """Return link model class, raise LookupError for other models"""
+        if model_name not in LINK_MODELS:
+            raise LookupError(f'{model_name!r} is not a link model')
+        return self.get_model(model_name)
+
+    def get_content_type(self, model_name):
+        """Raise LookupError if model is not registered"""
+        if self.content_types is None:
+            self.load()
+        try:
+            return self.content_types[model_name]
+        except KeyError:
+            raise LookupError(f'Model {model_name!r} is not registered')
+
+
+content_types = ContentTypeRegistry()
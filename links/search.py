@@ -0,0 +1,212 @@
+import math
+import re
+from collections import Counter
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    FloatField,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast
+
+from links import models
+from links.cache import TIMEOUT, get_catalogue_version
+
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# title terms count more than description terms
+TITLE_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+MAX_TERM_LENGTH = 64
+
+# the last word of a query is also matched as a prefix (eg. `chan` matches
+# `channel`), up to this number of terms
+MAX_PREFIX_EXPANSIONS = 50
+MIN_PREFIX_LENGTH = 2
+
+# minimum similarity of fuzzy (trigram) search results
+SIMILARITY_THRESHOLD = 0.5
+
+# arabic characters and their persian equivalent
+CHARACTER_MAP = str.maketrans({
+    'ي': 'ی',
+    'ى': 'ی',
+    'ئ': 'ی',
+    'ك': 'ک',
+    'ة': 'ه',
+    'ۀ': 'ه',
+    'أ': 'ا',
+    'إ': 'ا',
+    'ٱ': 'ا',
+    'آ': 'ا',
+    'ؤ': 'و',
+    # persian and arabic digits
+    '۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4',
+    '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+})
+
+# diacritics (harakat, tanvin, superscript alef) and tatweel
+DIACRITICS = re.compile('[\u064B-\u065F\u0670\u0640]')
+# zero width non-joiner and other zero width characters
+ZERO_WIDTH = re.compile('[\u200B-\u200F\u00AD]')
+WORD = re.compile(r'\w+')
+
+
+def normalize(text: str):
+    """
+    Normalize persian text for searching.
+    Arabic letters and digits are replaced by persian letters and english
+    digits, diacritics are dropped and words joined by ZWNJ are joined.
+    """
+    text = ZERO_WIDTH.sub('', text)
+    text = DIACRITICS.sub('', text)
+    return text.translate(CHARACTER_MAP).lower()
+
+
+def tokenize(text: str):
+    """Split normalized text into search terms"""
+    return [term[:MAX_TERM_LENGTH] for term in WORD.findall(normalize(text))]
+
+
+def get_term_frequencies(entry):
+    """
+    Weighted frequency of each term of the index entry (title and
+    description).
+    """
+    frequencies = Counter()
+    for term in tokenize(entry.title):
+        frequencies[term] += TITLE_WEIGHT
+    for term in tokenize(entry.description):
+        frequencies[term] += DESCRIPTION_WEIGHT
+    return frequencies
+
+
+def get_trigrams(text: str):
+    """
+    Set of trigrams of normalized words of text, each word is padded with
+    two spaces at the beginning and one at the end (like PostgreSQL pg_trgm).
+    """
+    trigrams = set()
+    for word in tokenize(text):
+        word = f'  {word} '
+        for i in range(len(word) - 2):
+            trigrams.add(word[i:i + 3])
+    return trigrams
+
+
+def get_fuzzy_text(link):
+    """
+    Text of a link used for fuzzy search: title, channel/page id and
+    domain of websites (without www).
+    """
+    texts = [link.title]
+    for field in ('channel_id', 'page_id'):
+        value = getattr(link, field, None)
+        if value:
+            texts.append(value)
+    if link.model_name == 'website':
+        domain = urlsplit(link.url).hostname or ''
+        if domain.startswith('www.'):
+            domain = domain[4:]
+        texts.append(domain.replace('.', ' '))
+    return ' '.join(texts)
+
+
+def get_index_stats():
+    """
+    Return number of index entries and their average length (BM25
+    parameters). Entries change only with the catalogue version, so they
+    are counted once per version instead of once per query.
+    """
+    key = f'links:search-stats:{get_catalogue_version()}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = models.LinkIndex.objects.aggregate(
+            total=Count('id'), average_length=Avg('term_count'))
+        stats = (stats['total'], stats['average_length'] or 1)
+        cache.set(key, stats, TIMEOUT)
+    return stats
+
+
+def search(q, queryset=None):
+    """
+    Return index entries matching `q` ordered by their BM25 score.
+    The result is a lazy queryset so it can be paginated in database.
+    """
+    if queryset is None:
+        queryset = models.LinkIndex.objects.all()
+
+    terms = tokenize(q)
+    if not terms:
+        return queryset.none()
+
+    total, average_length = get_index_stats()
+
+    postings = models.SearchPosting.objects.values_list('term')
+    document_frequencies = dict(
+        postings.filter(term__in=terms).annotate(Count('id')))
+
+    prefix = terms[-1]
+    if len(prefix) >= MIN_PREFIX_LENGTH:
+        expansions = (postings
+            .filter(term__startswith=prefix)
+            .annotate(Count('id'))
+            .order_by('term')[:MAX_PREFIX_EXPANSIONS])
+        document_frequencies.update(expansions)
+
+    if not document_frequencies:
+        return queryset.none()
+
+    # inverse document frequency of each term
+    idf = Case(*[
+        When(postings__term=term,
+             then=Value(math.log(1 + (total - df + 0.5) / (df + 0.5))))
+        for term, df in document_frequencies.items()
+    ], output_field=FloatField())
+
+    frequency = Cast('postings__frequency', FloatField())
+    length = Cast('term_count', FloatField())
+    score = idf * frequency * Value(K1 + 1) / (
+        frequency + Value(K1 * (1 - B)) + Value(K1 * B / average_length) * length)
+
+    return (queryset
+        .filter(postings__term__in=list(document_frequencies))
+        .annotate(score=Sum(score, output_field=FloatField()))
+        .order_by('-score', '-created', '-id'))
+
+
+def fuzzy_search(q, queryset=None):
+    """
+    Return index entries similar to `q` ordered by trigram similarity,
+    so misspelled queries still find links.
+    Candidates are looked up from the trigram index.
+    """
+    if queryset is None:
+        queryset = models.LinkIndex.objects.all()
+
+    trigrams = get_trigrams(q)
+    if not trigrams:
+        return queryset.none()
+
+    # similarity = part of query trigrams found in the entry, entries with
+    # fewer trigrams (more specific) come first on equal similarity
+    shared = Cast(Count('trigrams'), FloatField())
+    similarity = shared / Value(float(len(trigrams)))
+
+    return (queryset
+        .filter(trigrams__trigram__in=trigrams)
+        .annotate(similarity=similarity)
+        .filter(similarity__gte=SIMILARITY_THRESHOLD)
+        .order_by('-similarity', 'trigram_count', '-created', '-id'))
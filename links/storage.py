@@ -0,0 +1,27 @@
+import os
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Storage of files that are named by their contents (see
+    `links.models.image_upload_path`). A file that is stored already is
+    not written again, so identical uploads are stored once.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if not self.exists(name):
+            # concurrent uploads of the same contents may both get here,
+            # each writes a temporary file and replaces the other's
+            temp_name = super()._save(f'{name}.{uuid.uuid4().hex}.tmp',
+                content)
+            os.replace(self.path(temp_name), self.path(name))
+        return name
+
+
+image_storage = ContentAddressedStorage()
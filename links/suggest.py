@@ -0,0 +1,174 @@
+import bisect
+import threading
+import time
+
+from django.conf import settings
+
+from links import models
+from links.search import normalize
+
+
+# maximum number of keys kept in memory by each worker
+MAX_ENTRIES = getattr(settings, 'SUGGEST_MAX_ENTRIES', 50000)
+# seconds before the index is rebuilt, so changes made by other workers
+# (processes) are picked up
+TIMEOUT = getattr(settings, 'SUGGEST_TIMEOUT', 600)
+LIMIT = 10
+
+
+class PrefixIndex:
+    """
+    In-memory prefix index of titles of published links, names of their
+    tags and category names.
+
+    Keys are kept in a sorted list, a prefix lookup is a binary search
+    followed by a short scan. Every word of a text is a key too, so
+    `سایت` finds `وب سایت`.
+
+    Each text is counted by the index entries (`links.models.LinkIndex`)
+    using it, changes of entries add and remove them symmetrically.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, timeout=TIMEOUT):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        # only one thread (re)builds the index
+        self.load_lock = threading.Lock()
+        self.keys = []
+        # number of objects using each (text, type) pair
+        self.counts = {}
+        self.loaded_at = None
+
+    @staticmethod
+    def get_keys(text, type):
+        words = normalize(text).split()
+        for i in range(len(words)):
+            yield (' '.join(words[i:]), text, type)
+
+    def _add(self, text, type):
+        value = (text, type)
+        if value in self.counts:
+            self.counts[value] += 1
+            return
+        keys = list(self.get_keys(text, type))
+        if not keys or len(self.keys) + len(keys) > self.max_entries:
+            return
+        self.counts[value] = 1
+        for key in keys:
+            bisect.insort(self.keys, key)
+
+    def _remove(self, text, type):
+        value = (text, type)
+        count = self.counts.get(value)
+        if count is None:
+            return
+        if count > 1:
+            self.counts[value] = count - 1
+            return
+        del self.counts[value]
+        for key in self.get_keys(text, type):
+            i = bisect.bisect_left(self.keys, key)
+            if i < len(self.keys) and self.keys[i] == key:
+                del self.keys[i]
+
+    # changes are ignored until the index is loaded (on first lookup)
+    def add(self, text, type):
+        with self.lock:
+            if self.loaded_at is not None:
+                self._add(text, type)
+
+    def remove(self, text, type):
+        with self.lock:
+            if self.loaded_at is not None:
+                self._remove(text, type)
+
+    def replace(self, old_text, new_text, type):
+        with self.lock:
+            if self.loaded_at is None:
+                return
+            if old_text is not None:
+                self._remove(old_text, type)
+            if new_text is not None:
+                self._add(new_text, type)
+
+    def update(self, old_texts, new_texts, type):
+        """Replace texts of an object (eg. its old tags by new ones)"""
+        with self.lock:
+            if self.loaded_at is None:
+                return
+            for text in old_texts:
+                self._remove(text, type)
+            for text in new_texts:
+                self._add(text, type)
+
+    def load(self):
+        """(Re)build the index from database"""
+        keys = []
+        counts = {}
+        # index entries are published parent links only, so tags of drafts
+        # are not suggested
+        entry_tags = models.LinkIndex.tags.through.objects
+        texts = [
+            (models.LinkIndex.objects.values_list('title', flat=True), 'link'),
+            (entry_tags.values_list('tag__name', flat=True), 'tag'),
+            (models.Category.objects.values_list('name', flat=True),
+                'category'),
+        ]
+        for queryset, type in texts:
+            for text in queryset.iterator():
+                value = (text, type)
+                if value in counts:
+                    counts[value] += 1
+                    continue
+                new_keys = list(self.get_keys(text, type))
+                if len(keys) + len(new_keys) > self.max_entries:
+                    break
+                counts[value] = 1
+                keys.extend(new_keys)
+        keys.sort()
+
+        with self.lock:
+            self.keys = keys
+            self.counts = counts
+            self.loaded_at = time.monotonic()
+
+    def expired(self):
+        return self.loaded_at is None or \
+            time.monotonic() - self.loaded_at > self.timeout
+
+    def reload(self):
+        """
+        Rebuild the expired index once: while a thread rebuilds it, other
+        threads use the old index, or wait for the first one.
+        """
+        if not self.load_lock.acquire(blocking=self.loaded_at is None):
+            return
+        try:
+            if self.expired():
+                self.load()
+        finally:
+            self.load_lock.release()
+
+    def suggest(self, q, limit=LIMIT):
+        """Return up to `limit` (text, type) pairs starting with `q`"""
+        prefix = ' '.join(normalize(q).split())
+        if not prefix:
+            return []
+        if self.expired():
+            self.reload()
+
+        result = []
+        with self.lock:
+            i = bisect.bisect_left(self.keys, (prefix,))
+            while i < len(self.keys) and len(result) < limit:
+                key, text, type = self.keys[i]
+                if not key.startswith(prefix):
+                    break
+                if (text, type) not in result:
+                    result.append((text, type))
+                i += 1
+        return result
+
+
+suggestions = PrefixIndex()
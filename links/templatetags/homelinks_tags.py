@@ -1,4 +1,7 @@
 from django import template
+from django.utils.html import format_html, format_html_join
+
+from links import derivatives
 
 
 register = template.Library()
@@ -28,3 +31,36 @@ def model_name(obj):
 @register.filter
 def get_minutes(obj):
     return to_persian(obj[2:-1])
+
+
+@register.simple_tag
+def picture(obj, sizes, css_class='', src='thumbnail', loading='lazy'):
+    """
+    Render the link's image as <picture> with WebP and original format
+    variants, browsers pick a width by `sizes`. `src` (thumbnail or scaled)
+    is used by browsers without srcset and until variants are made.
+    Once the image is described, its size reserves the space and its
+    colour and blurred placeholder are shown until it loads.
+    """
+    if src == 'scaled':
+        url = obj.scaled_url
+        width = derivatives.SCALED_WIDTH
+    else:
+        url = obj.thumbnail_url
+        width = derivatives.THUMBNAIL_WIDTH
+    attrs = [('class', css_class), ('loading', loading)]
+    size = obj.get_image_size(width)
+    if size:
+        attrs += [('width', size[0]), ('height', size[1]),
+            ('style', obj.placeholder_style)]
+    attrs = format_html_join(' ', '{}="{}"', attrs)
+    if not obj.has_derivatives:
+        return format_html('<img {} src="{}" alt="{}">', attrs, url,
+            obj.title)
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img {} src="{}" srcset="{}" sizes="{}" alt="{}">'
+        '</picture>',
+        obj.get_srcset('webp'), sizes,
+        attrs, url, obj.get_srcset(), sizes, obj.title)
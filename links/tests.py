@@ -1,3 +1,1322 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import SkipFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import NoReverseMatch, reverse, set_script_prefix
+from django.utils import timezone, translation
+from PIL import Image
+from taggit.models import Tag
+
+from homelinks.cache import TwoTierCache
+from links import cache as links_cache
+from links import derivatives, search, utils
+from links.api.pagination import LinkKeysetPagination
+from links.api.serializers import LinkIndexSerializer
+from links.models import (
+    Category,
+    Channel,
+    ImageBlob,
+    ImageDerivative,
+    ImageJob,
+    LinkIndex,
+    SearchPosting,
+    SearchTrigram,
+    Website,
+)
+from links.pagination import (
+    MergePaginator,
+    MergedQuerySets,
+    decode_cursor,
+    encode_cursor,
+)
+from links.registry import ContentTypeRegistry
+from links.storage import image_storage
+from links.suggest import PrefixIndex, suggestions
+from links.urlbuilder import URLBuilder
+from links.uploads import (
+    HEADER_BYTES,
+    MAX_BYTES,
+    ImageUploadGuardHandler,
+    read_header,
+)
+from links.warmup import get_hot_paths, warm_up
+
+
+def use_temp_media_root(test):
+    """Store files of the test in a temporary MEDIA_ROOT"""
+    media_root = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, media_root)
+    media_settings = override_settings(MEDIA_ROOT=media_root)
+    media_settings.enable()
+    test.addCleanup(media_settings.disable)
+
+
+def make_image(format, size=(100, 100), noise=False, **options):
+    """Contents of an image file, of random pixels if `noise`"""
+    if noise:
+        img = Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3))
+    else:
+        img = Image.new('RGB', size, 'red')
+    output = io.BytesIO()
+    img.save(output, format, **options)
+    return output.getvalue()
+
+
+def create_link(model, author, number, **fields):
+    """Published link whose `created` is `number` minutes after 2020"""
+    fields.setdefault('status', 'published')
+    if model is Website:
+        fields.setdefault('url', f'https://site{number}.com/')
+        fields.setdefault('type', 'iranian')
+    elif model is Channel:
+        fields.setdefault('channel_id', f'channel{number}')
+        fields.setdefault('application', 'telegram')
+    created = timezone.make_aware(timezone.datetime(2020, 1, 1)) + \
+        timedelta(minutes=number)
+    fields.setdefault('image', SimpleUploadedFile('image.jpg',
+        make_image('JPEG')))
+    link = model(author=author, title=f'{model.__name__} {number}',
+        description='description', created=created, **fields)
+    link.save()
+    return link
+
+
+TWO_TIER_CACHES = {
+    'default': {
+        'BACKEND': 'homelinks.cache.TwoTierCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {'LOCAL_KEY_PREFIXES': ['links:']},
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'links-tests',
+    },
+}
+
+
+class LinkIndexTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        self.user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+
+    def test_published_parents_are_indexed(self):
+        link = create_link(Website, self.user, 1)
+        draft = create_link(Website, self.user, 2, status='draft')
+        self.assertEqual(list(LinkIndex.objects.values_list('object_id',
+            flat=True)), [link.pk])
+        draft.status = 'published'
+        draft.save()
+        link.status = 'draft'
+        link.save()
+        self.assertEqual(list(LinkIndex.objects.values_list('object_id',
+            flat=True)), [draft.pk])
+
+    def test_edits_do_not_touch_the_index(self):
+        link = create_link(Website, self.user, 1)
+        with mock.patch('links.models.bump_catalogue_version') as bump:
+            self.assertTrue(utils.validate_and_update_link(link,
+                {'title': 'edited'}))
+        bump.assert_not_called()
+        child = link.child
+        self.assertEqual((child.status, child.title), ('draft', 'edited'))
+        self.assertEqual(LinkIndex.objects.get().title, 'Website 1')
+
+        # the parent is updated once its child is published
+        child.status = 'published'
+        child.save()
+        self.assertEqual(LinkIndex.objects.get().title, 'edited')
+        self.assertEqual(LinkIndex.objects.count(), 1)
+
+
+class NormalizeTests(SimpleTestCase):
+    def test_arabic_letters_become_persian(self):
+        self.assertEqual(search.normalize('كتاب عربي'), 'کتاب عربی')
+
+    def test_digits_become_english(self):
+        self.assertEqual(search.normalize('۱۲۳ ٤٥'), '123 45')
+
+    def test_diacritics_and_zero_width_characters_are_dropped(self):
+        self.assertEqual(search.normalize('می\u200cروم'), 'میروم')
+        self.assertEqual(search.normalize('کِتابٌ'), 'کتاب')
+
+    def test_tokenize(self):
+        self.assertEqual(search.tokenize('Telegram كانال، فيلم!'),
+            ['telegram', 'کانال', 'فیلم'])
+
+
+def add_entry(title, description=''):
+    count = LinkIndex.objects.count()
+    entry = LinkIndex.objects.create(
+        model_name='website',
+        object_id=count + 1,
+        title=title,
+        slug=f'entry-{count}',
+        description=description,
+        image='images/a.jpg',
+        status='published',
+        created=timezone.now())
+    SearchPosting.objects.index(entry)
+    return entry
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        # index stats are cached by catalogue version
+        cache.clear()
+
+    def test_title_matches_rank_first(self):
+        in_description = add_entry('اخبار', 'کانال فوتبال ایران')
+        in_title = add_entry('فوتبال', 'اخبار ورزشی')
+        add_entry('سینما', 'فیلم')
+        self.assertEqual(list(search.search('فوتبال')),
+            [in_title, in_description])
+
+    def test_rare_terms_weigh_more(self):
+        common = add_entry('کانال خبر')
+        rare = add_entry('کانال ایران')
+        add_entry('کانال فیلم')
+        add_entry('کانال خبر فوری')
+        self.assertEqual(list(search.search('کانال ایران'))[0], rare)
+        self.assertEqual(list(search.search('کانال خبر'))[0], common)
+
+    def test_query_is_normalized(self):
+        entry = add_entry('کتاب فروشی')
+        self.assertEqual(list(search.search('كتاب')), [entry])
+
+    def test_last_term_matches_prefix(self):
+        entry = add_entry('telegram channel')
+        self.assertEqual(list(search.search('chan')), [entry])
+
+    def test_no_terms(self):
+        add_entry('کتاب')
+        self.assertEqual(list(search.search('!!')), [])
+        self.assertEqual(list(search.search('موسیقی')), [])
+
+    def test_index_stats_are_counted_once_per_version(self):
+        add_entry('کتاب', 'کتاب فروشی')
+        self.assertEqual(search.get_index_stats(), (1, 4))
+        with self.assertNumQueries(0):
+            search.get_index_stats()
+
+        add_entry('فیلم')
+        links_cache._bump_catalogue_version()
+        self.assertEqual(search.get_index_stats(), (2, 3))
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        values = ['2020-01-01T00:00:00+00:00', 'website', 12]
+        self.assertEqual(decode_cursor(encode_cursor(values)), values)
+
+    def test_invalid_cursors(self):
+        for cursor in ('zzz', '!!', encode_cursor({'a': 1})[:-2], 'bnVsbA=='):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    decode_cursor(cursor)
+
+    def test_invalid_positions(self):
+        paginator = MergePaginator([], 10)
+        for values in ([], ['not a date', 'website', 1],
+                ['2020-01-01T00:00:00', 'website', '1'],
+                ['2020-01-01T00:00:00', 1, 1]):
+            with self.subTest(values=values):
+                with self.assertRaises(ValueError):
+                    paginator.decode(encode_cursor(values))
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        self.user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        # websites and channels are interleaved, two links share `created`
+        self.links = [create_link(Website, self.user, number)
+            for number in range(0, 25, 2)]
+        self.links += [create_link(Channel, self.user, number)
+            for number in range(1, 25, 2)]
+        self.links.append(create_link(Channel, self.user, 24))
+        self.expected = sorted(self.links,
+            key=lambda link: (link.created, link.model_name, link.pk),
+            reverse=True)
+
+    def get_querysets(self):
+        return [Website.objects.all(), Channel.objects.all()]
+
+    def test_merge_pages_follow_cursors(self):
+        paginator = MergePaginator(self.get_querysets(), 4)
+        links, cursor = paginator.page()
+        pages = [links]
+        while cursor:
+            links, cursor = paginator.page(cursor)
+            pages.append(links)
+        self.assertEqual(len(pages[0]), 4)
+        self.assertEqual(sum(pages, []), self.expected)
+
+    def test_merge_invalid_cursor(self):
+        paginator = MergePaginator(self.get_querysets(), 4)
+        with self.assertRaises(ValueError):
+            paginator.page('zzz')
+
+    def test_merged_querysets(self):
+        merged = MergedQuerySets(self.get_querysets())
+        self.assertEqual(merged.count(), len(self.expected))
+        self.assertEqual(merged[5:10], self.expected[5:10])
+        self.assertEqual(merged[0], self.expected[0])
+
+    @mock.patch.object(LinkKeysetPagination, 'page_size', 5)
+    def test_keyset_api_follows_cursors(self):
+        response = self.client.get(reverse('links-apis:websites'),
+            {'cursor': ''})
+        titles = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            titles += [link['title'] for link in response.data['results']]
+            if response.data['next'] is None:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(titles, [f'Website {number}'
+            for number in range(24, -1, -2)])
+
+    def test_keyset_api_invalid_cursor(self):
+        response = self.client.get(reverse('links-apis:websites'),
+            {'cursor': 'zzz'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_pagination_by_default(self):
+        response = self.client.get(reverse('links-apis:websites'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 13)
+        self.assertIn('previous', response.data)
+
+
+class AggregateAPITests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        self.category = Category.objects.create(name='category')
+        for number in range(25):
+            create_link(Website, user, number, category=self.category)
+        self.url = reverse('links-apis:categorized_items',
+            args=[self.category.pk])
+
+    def get(self, url, params=None):
+        with mock.patch.object(LinkIndexSerializer, 'to_representation',
+                autospec=True, side_effect=lambda self, obj: obj.pk) as \
+                to_representation:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), to_representation.call_count
+
+    def test_only_rows_of_the_page_are_serialized(self):
+        data, serialized = self.get(self.url)
+        self.assertEqual((data['count'], len(data['results'])), (25, 20))
+        self.assertEqual(serialized, 20)
+
+        data, serialized = self.get(self.url, {'page': 2})
+        self.assertEqual(len(data['results']), 5)
+        self.assertEqual(serialized, 5)
+
+    def test_cursor_pages(self):
+        data, serialized = self.get(self.url, {'cursor': ''})
+        self.assertEqual(serialized, 20)
+        self.assertNotIn('count', data)
+        data, serialized = self.get(data['next'])
+        self.assertEqual(serialized, 5)
+        self.assertIsNone(data['next'])
+
+    def test_search_without_query(self):
+        data, serialized = self.get(reverse('links-apis:search'))
+        self.assertEqual((data['count'], data['results']), (0, []))
+
+
+class SuggestTests(TestCase):
+    def test_tags_of_published_links_only(self):
+        entry = add_entry('کانال فیلم')
+        entry.tags.add(Tag.objects.create(name='film', slug='film'))
+        # used by drafts only
+        Tag.objects.create(name='fiction', slug='fiction')
+
+        index = PrefixIndex()
+        self.assertEqual(index.suggest('fi'), [('film', 'tag')])
+        self.assertEqual(index.suggest('فیلم'), [('کانال فیلم', 'link')])
+
+    def test_texts_are_counted(self):
+        index = PrefixIndex()
+        index.load()
+        index.update([], ['film'], 'tag')
+        index.update([], ['film'], 'tag')
+        index.update(['film'], [], 'tag')
+        self.assertEqual(index.suggest('film'), [('film', 'tag')])
+        index.update(['film'], ['movie'], 'tag')
+        self.assertEqual(index.suggest('film'), [])
+        self.assertEqual(index.suggest('mov'), [('movie', 'tag')])
+
+    def test_renamed_category_replaces_old_name(self):
+        category = Category.objects.create(name='فیلم')
+        suggestions.load()
+        category = Category.objects.get(pk=category.pk)
+        category.name = 'سینما'
+        category.save()
+        self.assertEqual(suggestions.suggest('فیلم'), [])
+        self.assertEqual(suggestions.suggest('سین'), [('سینما', 'category')])
+
+    def test_expired_index_is_rebuilt_by_one_thread(self):
+        index = PrefixIndex(timeout=0)
+        index.load()
+        index.update([], ['film'], 'tag')
+        # another thread is rebuilding it, the old index is used meanwhile
+        with index.load_lock, mock.patch.object(index, 'load') as load:
+            self.assertEqual(index.suggest('film'), [('film', 'tag')])
+        load.assert_not_called()
+
+
+class FacetsTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        self.category = Category.objects.create(name='category')
+        for number, type in enumerate(('iranian', 'iranian', 'foreign')):
+            create_link(Website, user, number, type=type,
+                category=self.category)
+        for number, application in enumerate(('telegram', 'telegram', 'gap')):
+            create_link(Channel, user, number, application=application,
+                category=self.category)
+
+    def get(self, params):
+        response = self.client.get(reverse('links-apis:categorized_items',
+            args=[self.category.pk]), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_facets_exclude_their_own_filter(self):
+        data = self.get({'app': 'telegram'})
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['facets']['app'], {'telegram': 2, 'gap': 1})
+        self.assertEqual(data['facets']['model'], {'channel': 2})
+        self.assertEqual(data['facets']['category'], {self.category.pk: 2})
+
+    def test_facets_keep_other_filters(self):
+        data = self.get({'model': 'website', 'type': 'iranian'})
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['facets']['type'], {'iranian': 2, 'foreign': 1})
+        self.assertEqual(data['facets']['model'], {'website': 2})
+        self.assertEqual(data['facets']['app'], {})
+
+
+def add_fuzzy_entry(title, created=None):
+    entry = add_entry(title)
+    if created is not None:
+        LinkIndex.objects.filter(pk=entry.pk).update(created=created)
+    SearchTrigram.objects.index(entry, title)
+    return entry
+
+
+class FuzzySearchTests(TestCase):
+    def test_misspelled_query_matches(self):
+        entry = add_fuzzy_entry('telegram')
+        add_fuzzy_entry('instagram')
+        results = list(search.fuzzy_search('telegran'))
+        self.assertEqual(results, [entry])
+        self.assertGreaterEqual(results[0].similarity,
+            search.SIMILARITY_THRESHOLD)
+
+    def test_persian_query_is_normalized(self):
+        entry = add_fuzzy_entry('کتابخانه')
+        self.assertEqual(list(search.fuzzy_search('كتابخانة')), [entry])
+
+    def test_below_threshold(self):
+        add_fuzzy_entry('telegram')
+        # shares only the "  t" and " te" trigrams
+        self.assertEqual(list(search.fuzzy_search('text')), [])
+        self.assertEqual(list(search.fuzzy_search('!!')), [])
+
+    def test_more_similar_first(self):
+        close = add_fuzzy_entry('football')
+        far = add_fuzzy_entry('footwear')
+        results = list(search.fuzzy_search('footbal'))
+        self.assertEqual(results, [close, far])
+        self.assertGreater(results[0].similarity, results[1].similarity)
+
+    def test_fewer_trigrams_first_on_equal_similarity(self):
+        longer = add_fuzzy_entry('football news')
+        shorter = add_fuzzy_entry('football')
+        self.assertEqual(list(search.fuzzy_search('football')),
+            [shorter, longer])
+
+    def test_newer_first_on_equal_trigrams(self):
+        now = timezone.now()
+        older = add_fuzzy_entry('football', now - timedelta(days=1))
+        newer = add_fuzzy_entry('football', now)
+        self.assertEqual(list(search.fuzzy_search('football')),
+            [newer, older])
+
+    def test_higher_id_first_on_equal_created(self):
+        now = timezone.now()
+        first = add_fuzzy_entry('football', now)
+        second = add_fuzzy_entry('football', now)
+        self.assertEqual(list(search.fuzzy_search('football')),
+            [second, first])
+
+
+@override_settings(CACHES=TWO_TIER_CACHES)
+class CatalogueVersionTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_bump_changes_version(self):
+        version = links_cache.get_catalogue_version()
+        links_cache._bump_catalogue_version()
+        self.assertGreater(links_cache.get_catalogue_version(), version)
+
+    def test_bump_after_eviction(self):
+        version = links_cache.get_catalogue_version()
+        caches['shared'].delete(links_cache.CATALOGUE_VERSION_KEY)
+
+        links_cache._bump_catalogue_version()
+        bumped = links_cache.get_catalogue_version()
+        self.assertGreaterEqual(bumped, version)
+        # the recreated version is still a counter
+        links_cache._bump_catalogue_version()
+        self.assertEqual(links_cache.get_catalogue_version(), bumped + 1)
+
+
+class CachedPagesTests(TransactionTestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        self.link = create_link(Website, self.user, 1)
+
+    def test_index_after_publish(self):
+        self.assertContains(self.client.get(reverse('links:index')),
+            'Website 1')
+        link = create_link(Website, self.user, 2, status='draft')
+        self.assertNotContains(self.client.get(reverse('links:index')),
+            'Website 2')
+        link.status = 'published'
+        link.save()
+        self.assertContains(self.client.get(reverse('links:index')),
+            'Website 2')
+
+    def test_index_api_after_unpublish(self):
+        url = reverse('links-apis:index')
+        self.assertContains(self.client.get(url), 'Website 1')
+        self.link.status = 'draft'
+        self.link.save()
+        self.assertNotContains(self.client.get(url), 'Website 1')
+
+    def test_link_fragments_after_edit(self):
+        url = reverse('links:websites')
+        self.assertContains(self.client.get(url), 'Website 1')
+        self.link.title = 'Edited website'
+        self.link.save()
+        response = self.client.get(url)
+        self.assertContains(response, 'Edited website')
+        self.assertNotContains(response, 'Website 1')
+
+
+class ContentTypeRegistryTests(TestCase):
+    def setUp(self):
+        ContentType.objects.clear_cache()
+
+    def test_content_types_are_fetched_once(self):
+        registry = ContentTypeRegistry()
+        with self.assertNumQueries(1):
+            registry.get_content_type('website')
+        with self.assertNumQueries(0):
+            for model_name in ('website', 'channel', 'group', 'instagram',
+                    'report', 'contactus'):
+                content_type = registry.get_content_type(model_name)
+                model = registry.get_model(model_name)
+                self.assertEqual(content_type.model_class(), model)
+
+    def test_unknown_models(self):
+        registry = ContentTypeRegistry()
+        with self.assertRaises(LookupError):
+            registry.get_content_type('user')
+        with self.assertRaises(LookupError):
+            registry.get_model('user')
+        with self.assertRaises(LookupError):
+            registry.get_link_model('report')
+
+    def test_report_page_queries(self):
+        use_temp_media_root(self)
+        user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        link = create_link(Website, user, 1)
+        url = reverse('links:report', args=['website', link.slug])
+        self.client.get(url)
+        # the link only, its content type comes from the registry
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(
+            reverse('links:report', args=['user', link.slug])).status_code,
+            404)
+
+
+class URLBuilderTests(SimpleTestCase):
+    MODEL_NAMES = ('website', 'channel', 'group', 'instagram')
+
+    def setUp(self):
+        self.builder = URLBuilder()
+
+    def assertBuildsLikeReverse(self, view_name, value, kwarg=None):
+        for language, name in settings.LANGUAGES:
+            with self.subTest(view_name=view_name, value=value,
+                    language=language):
+                with translation.override(language):
+                    if kwarg is None:
+                        expected = reverse(view_name, args=(value,))
+                    else:
+                        expected = reverse(view_name, kwargs={kwarg: value})
+                    self.assertEqual(
+                        self.builder.build(view_name, value, kwarg),
+                        expected)
+                self.assertEqual(
+                    self.builder.build(view_name, value, kwarg, language),
+                    expected)
+
+    def test_link_urls(self):
+        for model_name in self.MODEL_NAMES:
+            for action in ('detail', 'update', 'delete'):
+                for namespace in ('links', 'links-apis'):
+                    for slug in ('telegram-news', 'ig-news_2019', '42'):
+                        self.assertBuildsLikeReverse(
+                            f'{namespace}:{model_name}-{action}', slug,
+                            'slug')
+
+    def test_admin_urls(self):
+        for model_name in self.MODEL_NAMES:
+            self.assertBuildsLikeReverse(
+                f'admin:links_{model_name}_change', 12)
+
+    def test_values_that_need_quoting(self):
+        for slug in ('اخبار-فوتبال', 'a b', 'a&b'):
+            self.assertBuildsLikeReverse('links:tagged_items', slug,
+                'tag_slug')
+
+    def test_values_not_matching_the_pattern(self):
+        for slug in ('اخبار-فوتبال', 'a/b'):
+            with self.assertRaises(NoReverseMatch):
+                self.builder.build('links:website-detail', slug, 'slug')
+
+    def test_templates_are_cached(self):
+        self.builder.build('links:website-detail', 'a', 'slug', 'en')
+        with translation.override('en'):
+            expected = reverse('links:website-detail', kwargs={'slug': 'b'})
+        with mock.patch.object(URLBuilder, 'reverse') as reverse_mock:
+            self.assertEqual(
+                self.builder.build('links:website-detail', 'b', 'slug', 'en'),
+                expected)
+        reverse_mock.assert_not_called()
+
+    def test_script_prefix(self):
+        url = self.builder.build('links:website-detail', 'a', 'slug', 'en')
+        set_script_prefix('/prefix/')
+        self.addCleanup(set_script_prefix, '/')
+        self.assertEqual(
+            self.builder.build('links:website-detail', 'a', 'slug', 'en'),
+            '/prefix' + url)
+
+    def test_active_language_is_kept(self):
+        with translation.override('fa'):
+            self.builder.build('links:website-detail', 'a', 'slug', 'en')
+            self.assertEqual(translation.get_language(), 'fa')
+
+
+class ConditionalGetTests(TransactionTestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        self.link = create_link(Website, self.user, 1)
+        self.url = reverse('links-apis:websites')
+
+    def get(self, accept='application/json', **headers):
+        return self.client.get(self.url, HTTP_ACCEPT=accept, **headers)
+
+    def test_not_modified(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Accept', response['Vary'])
+        etag = response['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('Accept', response['Vary'])
+
+    def test_representations_have_their_own_etags(self):
+        etag = self.get()['ETag']
+        response = self.get('text/html', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('text/html', response['Content-Type'])
+
+    def test_etag_changes_after_publish(self):
+        etag = self.get()['ETag']
+        create_link(Website, self.user, 2)
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['count'], 2)
+
+
+@override_settings(CACHES=TWO_TIER_CACHES)
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.lock_key = links_cache.make_key('page', 1) + ':lock'
+        patcher = mock.patch.object(links_cache, 'WAIT_TIMEOUT', 0.2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, value):
+        return links_cache.get_or_compute('page', lambda: value, 1)
+
+    def test_cached_until_version_changes(self):
+        self.assertEqual(self.get('first'), 'first')
+        self.assertEqual(self.get('second'), 'first')
+        links_cache._bump_catalogue_version()
+        self.assertEqual(self.get('second'), 'second')
+
+    def test_older_versions_are_not_served_while_refreshing(self):
+        self.get('first')
+        links_cache._bump_catalogue_version()
+        # another worker is computing the new version
+        self.assertTrue(links_cache.acquire_lock(self.lock_key))
+        self.assertEqual(self.get('second'), 'second')
+
+    def test_stale_results_are_served_while_refreshing(self):
+        with mock.patch.object(links_cache, 'SOFT_TIMEOUT', 0):
+            self.get('first')
+        self.assertTrue(links_cache.acquire_lock(self.lock_key))
+        self.assertEqual(self.get('second'), 'first')
+        links_cache.release_lock(self.lock_key)
+        self.assertEqual(self.get('second'), 'second')
+
+    def test_missing_results_are_waited_for(self):
+        self.assertTrue(links_cache.acquire_lock(self.lock_key))
+
+        def sleep(seconds):
+            # the worker that took the lock caches its result
+            links_cache.release_lock(self.lock_key)
+            links_cache.get_or_compute('page', lambda: 'other', 1)
+
+        compute = mock.Mock(return_value='mine')
+        with mock.patch('links.cache.time.sleep', sleep):
+            self.assertEqual(
+                links_cache.get_or_compute('page', compute, 1), 'other')
+        compute.assert_not_called()
+
+    def test_file_locks(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir)
+        with mock.patch.object(links_cache, 'LOCK_DIR',
+                os.path.join(lock_dir, 'locks')):
+            self.assertTrue(links_cache.acquire_lock('key'))
+            self.assertFalse(links_cache.acquire_lock('key'))
+            links_cache.release_lock('key')
+            self.assertTrue(links_cache.acquire_lock('key'))
+
+            # locks of dead workers expire
+            path = links_cache.get_lock_path('key')
+            expired = time.time() - links_cache.LOCK_TIMEOUT - 1
+            os.utime(path, (expired, expired))
+            self.assertTrue(links_cache.acquire_lock('key'))
+
+
+class CategorizedItemsTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        self.category = Category.objects.create(name='category')
+        for number in range(3):
+            create_link(Website, user, number, category=self.category)
+
+    @mock.patch('links.views.get_or_compute',
+        wraps=links_cache.get_or_compute)
+    def test_pages_are_clamped_before_caching(self, get_or_compute):
+        url = reverse('links:categorized_items', args=[self.category.pk])
+        for page in ('1', '2', '999999', '0', '-1', 'x', ''):
+            response = self.client.get(url, {'page': page})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context['page_obj']), 3)
+        pages = {call[0][3] for call in get_or_compute.call_args_list
+            if call[0][0] == 'categorized-items'}
+        self.assertEqual(pages, {1})
+
+    def test_unknown_category(self):
+        url = reverse('links:categorized_items', args=[self.category.pk + 1])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+@override_settings(CACHES=TWO_TIER_CACHES)
+class TwoTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['shared'].clear()
+
+    def make_cache(self, **options):
+        """Two-tier cache of another process"""
+        options.setdefault('LOCAL_KEY_PREFIXES', ['links:'])
+        return TwoTierCache('shared', {'OPTIONS': options})
+
+    def test_least_recently_used_are_evicted(self):
+        two_tier = self.make_cache(LOCAL_MAX_ENTRIES=2)
+        for name in ('a', 'b', 'c'):
+            two_tier.set(f'links:{name}', name)
+            two_tier.get('links:a')
+        self.assertEqual(two_tier.get_stats()['local_entries'], 2)
+        self.assertEqual(two_tier.get_stats()['local_hits'], 3)
+        # b was evicted, it is read from the shared cache
+        self.assertEqual(two_tier.get('links:b'), 'b')
+        self.assertEqual(two_tier.get_stats()['shared_hits'], 1)
+
+    def test_changes_of_other_processes(self):
+        first, second = self.make_cache(), self.make_cache()
+        first.set('links:a', 1)
+        self.assertEqual(second.get('links:a'), 1)
+        first.set('links:a', 2)
+        # the local value is used until LOCAL_TIMEOUT
+        self.assertEqual(second.get('links:a'), 1)
+        with mock.patch('homelinks.cache.time.time',
+                return_value=time.time() + 10):
+            self.assertEqual(second.get('links:a'), 2)
+            first.delete('links:a')
+        with mock.patch('homelinks.cache.time.time',
+                return_value=time.time() + 20):
+            self.assertIsNone(second.get('links:a'))
+
+    def test_unchanged_values_are_kept_locally(self):
+        first, second = self.make_cache(), self.make_cache()
+        first.set('links:a', 1)
+        second.get('links:a')
+        with mock.patch('homelinks.cache.time.time',
+                return_value=time.time() + 10):
+            self.assertEqual(second.get('links:a'), 1)
+        self.assertEqual(second.get_stats()['local_hits'], 1)
+
+    def test_only_prefixed_keys_are_kept_locally(self):
+        two_tier = self.make_cache()
+        two_tier.set('other', 1)
+        two_tier.get('other')
+        self.assertEqual(two_tier.get_stats()['local_entries'], 0)
+        # counters are created by add
+        two_tier.add('links:counter', 1)
+        self.assertEqual(two_tier.incr('links:counter'), 2)
+
+    def test_published_stats(self):
+        two_tier = self.make_cache(STATS_INTERVAL=0)
+        two_tier.set('links:a', 1)
+        two_tier.get('links:a')
+        two_tier.get('links:b')
+        stats = list(two_tier.get_all_stats().values())
+        self.assertEqual(len(stats), 1)
+        self.assertEqual((stats[0]['local_hits'], stats[0]['shared_misses']),
+            (1, 1))
+
+        output = io.StringIO()
+        call_command('cache_stats', stdout=output)
+        self.assertIn('local_hits 1', output.getvalue())
+        self.assertIn('total (1 processes)', output.getvalue())
+
+
+class WarmUpTests(TransactionTestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        self.category = Category.objects.create(name='category')
+        create_link(Website, user, 1, category=self.category)
+
+    def test_hot_pages_are_rendered(self):
+        paths = get_hot_paths()
+        self.assertIn(reverse('links:categorized_items',
+            args=[self.category.pk]), paths)
+        results = warm_up(paths, workers=1, host='testserver')
+        self.assertEqual([(path, status_code)
+            for path, status_code, seconds in results],
+            [(path, 200) for path in paths])
+
+    def test_tags_without_slugs_are_skipped(self):
+        link = Website.objects.get()
+        link.tags.add('فیلم', 'film')
+        self.assertEqual(Tag.objects.get(name='فیلم').slug, '')
+        paths = get_hot_paths()
+        self.assertIn(reverse('links:tagged_items', args=['film']), paths)
+
+    def test_query_strings(self):
+        results = warm_up(['/category/%d/?page=x' % self.category.pk],
+            workers=1, host='testserver', secure=False)
+        self.assertEqual(results[0][1], 200)
+
+    def test_missing_pages(self):
+        results = warm_up(['/category/1000/', '/missing/'], workers=1)
+        self.assertEqual([status_code
+            for path, status_code, seconds in results], [404, 404])
+
+
+class ImageJobTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        self.user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+
+    def create_link(self, number, content=None, name='image.jpg'):
+        link = create_link(Website, self.user, number,
+            image=SimpleUploadedFile(name, content or make_image('JPEG')))
+        return Website.objects.get(pk=link.pk)
+
+    def process_jobs(self):
+        call_command('process_image_jobs', once=True, stdout=io.StringIO(),
+            stderr=io.StringIO())
+
+    def test_claim(self):
+        first = self.create_link(1)
+        self.create_link(2)
+        job = ImageJob.objects.claim()
+        self.assertEqual((job.object_id, job.status, job.attempts),
+            (first.pk, 'running', 1))
+        ImageJob.objects.claim()
+        self.assertIsNone(ImageJob.objects.claim())
+
+    def test_requeue_stale(self):
+        self.create_link(1)
+        job = ImageJob.objects.claim()
+        self.assertEqual(ImageJob.objects.requeue_stale(60), 0)
+        ImageJob.objects.filter(pk=job.pk).update(
+            updated=timezone.now() - timedelta(seconds=120))
+        self.assertEqual(ImageJob.objects.requeue_stale(60), 1)
+        self.assertEqual(ImageJob.objects.claim().attempts, 2)
+
+    def test_failed_jobs_are_retried(self):
+        self.create_link(1, b'not an image')
+        job = ImageJob.objects.claim()
+        job.fail('error')
+        self.assertEqual(ImageJob.objects.get().status, 'pending')
+        # the command claims it again until it is failed
+        self.process_jobs()
+        job = ImageJob.objects.get()
+        self.assertEqual((job.status, job.attempts),
+            ('failed', ImageJob.MAX_ATTEMPTS))
+        self.assertIn('Traceback', job.error)
+
+    def test_process_jobs(self):
+        link = self.create_link(1, make_image('JPEG', (400, 300)))
+        self.assertFalse(link.thumbnail_ready)
+        self.process_jobs()
+        self.assertFalse(ImageJob.objects.exists())
+        link.refresh_from_db()
+        self.assertTrue(link.has_derivatives)
+        self.assertEqual(ImageDerivative.objects.count(),
+            len(derivatives.get_variants()))
+        entry = LinkIndex.objects.get()
+        self.assertTrue(entry.has_derivatives)
+        self.assertEqual(entry.image_hash, link.image_hash)
+
+    def test_obsolete_jobs_are_skipped(self):
+        link = self.create_link(1)
+        link.delete()
+        self.process_jobs()
+        self.assertFalse(ImageJob.objects.exists())
+        self.assertFalse(ImageDerivative.objects.exists())
+
+
+class DerivativeFilesTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        self.user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+
+    def process(self, number, content, name='image.jpg'):
+        link = create_link(Website, self.user, number,
+            image=SimpleUploadedFile(name, content))
+        call_command('process_image_jobs', once=True, stdout=io.StringIO())
+        link.refresh_from_db()
+        return link
+
+    def test_identical_contents_share_derivatives(self):
+        content = make_image('JPEG')
+        first = self.process(1, content)
+        second = self.process(2, content, name='other.jpg')
+        self.assertEqual(first.image_hash, second.image_hash)
+        self.assertEqual(first.thumbnail_url, second.thumbnail_url)
+        self.assertEqual(ImageDerivative.objects.count(),
+            len(derivatives.get_variants()))
+
+        third = self.process(3, make_image('JPEG', (200, 100)))
+        self.assertNotEqual(third.thumbnail_url, first.thumbnail_url)
+        self.assertEqual(ImageDerivative.objects.count(),
+            2 * len(derivatives.get_variants()))
+
+    def test_sources_without_extension(self):
+        link = self.process(1, make_image('PNG'), name='image')
+        self.assertTrue(link.has_derivatives)
+        self.assertFalse(ImageJob.objects.exists())
+        derivative = ImageDerivative.objects.get(name='160')
+        with Image.open(default_storage.path(derivative.file)) as img:
+            self.assertEqual(img.format, 'PNG')
+
+
+class ImageDerivativesTests(SimpleTestCase):
+    def get_entry(self, **kwargs):
+        fields = {
+            'image': 'images/ab/abcd.jpg',
+            'image_hash': 'abcd',
+            'thumbnail_ready': True,
+            'derivatives_signature': derivatives.SIGNATURE,
+        }
+        fields.update(kwargs)
+        return LinkIndex(**fields)
+
+    def test_ready_derivatives(self):
+        entry = self.get_entry()
+        self.assertTrue(entry.thumbnail_url.startswith('/media/derivatives/'))
+        self.assertEqual(entry.get_srcset().count('w, '),
+            len(derivatives.WIDTHS) - 1)
+
+    def test_derivatives_of_other_settings_are_not_used(self):
+        entry = self.get_entry()
+        with mock.patch.object(derivatives, 'SIGNATURE', 'other'):
+            self.assertFalse(entry.has_derivatives)
+            self.assertEqual(entry.thumbnail_url, entry.image.url)
+            self.assertEqual(entry.scaled_url, entry.image.url)
+            self.assertEqual(entry.get_srcset(), '')
+            self.assertEqual(entry.image_variants, [])
+
+    def test_pending_derivatives(self):
+        entry = self.get_entry(thumbnail_ready=False,
+            derivatives_signature='')
+        self.assertEqual(entry.thumbnail_url, entry.image.url)
+
+    def test_legacy_thumbnail(self):
+        entry = self.get_entry(image_hash='', derivatives_signature='')
+        self.assertEqual(entry.thumbnail_url,
+            '/media/images/ab/abcd_thumbnail.jpg')
+
+    def test_derivatives_of_current_settings(self):
+        key = derivatives.get_key('abcd', 320, 'webp', '.jpg')
+        file_name = derivatives.get_name(key, '.webp')
+        self.assertTrue(derivatives.is_current(key, 'abcd', '320.webp',
+            file_name))
+        key = derivatives.get_key('abcd', 320, '', '.png')
+        file_name = derivatives.get_name(key, '.png')
+        self.assertTrue(derivatives.is_current(key, 'abcd', '320', file_name))
+
+    def test_derivatives_of_older_settings(self):
+        key = derivatives.get_key('abcd', 320, '', '.png')
+        file_name = derivatives.get_name(key, '.png')
+        with mock.patch.object(derivatives, 'VERSION', derivatives.VERSION + 1):
+            self.assertFalse(derivatives.is_current(key, 'abcd', '320',
+                file_name))
+        with mock.patch.object(derivatives, 'WIDTHS', (160, 640)):
+            self.assertFalse(derivatives.is_current(key, 'abcd', '320',
+                file_name))
+
+
+class WriteAllTests(SimpleTestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+
+    def write_all(self, content, widths, format=''):
+        """Sizes of derivatives of the widths written by `write_all`"""
+        source_path = os.path.join(settings.MEDIA_ROOT, 'source')
+        with open(source_path, 'wb') as f:
+            f.write(content)
+        targets = [(os.path.join(settings.MEDIA_ROOT, str(width)), width,
+            format) for width in widths]
+        derivatives.write_all(source_path, targets)
+        sizes = []
+        for path, width, format in targets:
+            with Image.open(path) as img:
+                sizes.append(img.size)
+        return sizes
+
+    def test_all_widths_from_a_single_decode(self):
+        with mock.patch.object(derivatives, 'decode',
+                wraps=derivatives.decode) as decode:
+            sizes = self.write_all(make_image('JPEG', (1600, 1200)),
+                (160, 320, 640))
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(sizes, [(160, 120), (320, 240), (640, 480)])
+
+    def test_large_images_are_shrunk_once(self):
+        with mock.patch.object(Image.Image, 'resize',
+                autospec=True, side_effect=Image.Image.resize) as resize:
+            sizes = self.write_all(make_image('PNG', (2000, 1500)), (160,))
+        self.assertEqual(sizes, [(160, 120)])
+        # to twice the box, then to the box
+        self.assertEqual([call[0][1] for call in resize.call_args_list[:2]],
+            [(320, 240), (160, 120)])
+
+    def test_rotated_images_are_upright(self):
+        exif = Image.Exif()
+        exif[derivatives.EXIF_ORIENTATION] = 6
+        sizes = self.write_all(make_image('JPEG', (400, 300), exif=exif),
+            (160,))
+        self.assertEqual(sizes, [(90, 120)])
+
+    def test_small_images_are_not_enlarged(self):
+        self.assertEqual(self.write_all(make_image('PNG', (100, 50)),
+            (320,), 'webp'), [(100, 50)])
+
+
+class ImageBlobTests(TransactionTestCase):
+    # files are removed after commit
+    name = 'images/ab/abcd.jpg'
+
+    def setUp(self):
+        use_temp_media_root(self)
+        image_storage.save(self.name, ContentFile(b'image'))
+        self.path = image_storage.path(self.name)
+        self.thumbnail_path = self.path.replace('.jpg', '_thumbnail.jpg')
+        image_storage.save(self.name.replace('.jpg', '_thumbnail.jpg'),
+            ContentFile(b'thumbnail'))
+
+    def get_references(self):
+        return ImageBlob.objects.filter(file=self.name).values_list(
+            'references', flat=True).first()
+
+    def test_references_are_counted(self):
+        ImageBlob.objects.retain(self.name)
+        ImageBlob.objects.retain(self.name)
+        self.assertEqual(self.get_references(), 2)
+
+        ImageBlob.objects.release(self.name, '')
+        self.assertEqual(self.get_references(), 1)
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_unreferenced_file_is_removed(self):
+        ImageBlob.objects.retain(self.name)
+        ImageBlob.objects.release(self.name, '')
+        self.assertIsNone(self.get_references())
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.thumbnail_path))
+
+    def test_file_is_removed_after_commit(self):
+        ImageBlob.objects.retain(self.name)
+        with transaction.atomic():
+            ImageBlob.objects.release(self.name, '')
+            self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_file_referenced_again_before_removal_is_kept(self):
+        ImageBlob.objects.retain(self.name)
+        with transaction.atomic():
+            ImageBlob.objects.release(self.name, '')
+            # identical upload before the removal runs
+            ImageBlob.objects.retain(self.name)
+        self.assertEqual(self.get_references(), 1)
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_release_of_unknown_file(self):
+        ImageBlob.objects.release('images/cd/cdef.jpg', '')
+        self.assertTrue(os.path.exists(self.path))
+
+
+class RederiveImagesTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+        # derivatives are made by the command, not by jobs
+        self.links = [create_link(Website, user, number,
+            image=SimpleUploadedFile('image.jpg',
+                make_image('JPEG', (100 + number, 100))))
+            for number in range(3)]
+        ImageJob.objects.all().delete()
+        checkpoint_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, checkpoint_dir)
+        self.checkpoint = os.path.join(checkpoint_dir, 'checkpoint.json')
+
+    def rederive(self, **options):
+        output = io.StringIO()
+        call_command('rederive_images', workers=1, batch_size=1,
+            checkpoint=self.checkpoint, stdout=output, stderr=io.StringIO(),
+            **options)
+        return output.getvalue()
+
+    def get_ready(self):
+        return list(Website.objects.order_by('pk').values_list(
+            'thumbnail_ready', flat=True))
+
+    def test_resume_after_interruption(self):
+        from links.images import record
+        calls = []
+
+        def interrupt(results):
+            calls.append(results)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            record(results)
+
+        with mock.patch(
+                'links.management.commands.rederive_images.record',
+                interrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.rederive()
+        self.assertEqual(self.get_ready(), [True, False, False])
+        with open(self.checkpoint) as checkpoint:
+            state = json.load(checkpoint)
+        self.assertEqual(state['done'], 1)
+        first_blob = ImageBlob.objects.order_by('pk').first()
+        self.assertEqual(state['last_id'], first_blob.pk)
+
+        output = self.rederive()
+        self.assertIn(f'Resuming after image {first_blob.pk}', output)
+        self.assertIn('2/2 images', output)
+        self.assertEqual(self.get_ready(), [True, True, True])
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_restart(self):
+        self.rederive()
+        output = self.rederive(restart=True, force=True)
+        self.assertIn('3/3 images', output)
+        self.assertIn(f'{3 * len(derivatives.get_variants())} derivatives '
+            'made', output)
+
+    def test_derivatives_of_older_settings_are_removed(self):
+        self.rederive()
+        old_files = list(ImageDerivative.objects.values_list('file',
+            flat=True))
+        with mock.patch.object(derivatives, 'VERSION',
+                derivatives.VERSION + 1):
+            output = self.rederive()
+        count = 3 * len(derivatives.get_variants())
+        self.assertIn(f'{count} derivatives made', output)
+        self.assertIn(f'{count} derivatives of older settings removed',
+            output)
+        self.assertEqual(ImageDerivative.objects.count(), count)
+        self.assertFalse(ImageDerivative.objects.filter(
+            file__in=old_files).exists())
+
+
+class UploadGuardTests(TestCase):
+    def upload(self, content, chunk_size=64 * 1024):
+        """Return errors of uploading `content` in chunks"""
+        request = RequestFactory().post('/')
+        handler = ImageUploadGuardHandler(request)
+        handler.new_file('image', 'image', 'image/octet-stream',
+            len(content))
+        try:
+            for start in range(0, len(content), chunk_size):
+                handler.receive_data_chunk(
+                    content[start:start + chunk_size], start)
+        except SkipFile:
+            pass
+        return getattr(request, 'rejected_uploads', {})
+
+    def test_jpeg(self):
+        self.assertEqual(self.upload(make_image('JPEG')), {})
+
+    def test_oversized_file(self):
+        content = make_image('JPEG') + bytes(MAX_BYTES)
+        self.assertIn('image', self.upload(content))
+
+    def test_decompression_bomb(self):
+        img = Image.new('1', (6000, 5000))
+        output = io.BytesIO()
+        img.save(output, 'PNG')
+        self.assertIn('megapixels', self.upload(output.getvalue())['image'])
+
+    def test_not_an_image(self):
+        self.assertIn('image', self.upload(b'text' * HEADER_BYTES))
+
+    def test_large_webp(self):
+        content = make_image('WEBP', (800, 800), noise=True, lossless=True)
+        self.assertGreater(len(content), HEADER_BYTES)
+        self.assertEqual(self.upload(content, chunk_size=1024), {})
+
+    def test_webp_headers(self):
+        for options in ({'quality': 80}, {'lossless': True},
+                {'exif': Image.Exif()}, {'icc_profile': b'icc'}):
+            content = make_image('WEBP', (321, 123), **options)
+            self.assertEqual(read_header(content[:64]), ('WEBP', 321, 123),
+                options)
+        self.assertIsNone(read_header(content[:20]))
+
+    def test_admin_form_errors(self):
+        request = RequestFactory().post('/')
+        request.rejected_uploads = {'image': 'Upload a valid image.'}
+        form_class = admin.site._registry[Website].get_form(request)
+        form = form_class({'title': 'title', 'url': 'https://example.com/'})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['image'], ['Upload a valid image.'])
+
+
+class ImageInfoTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        self.user = get_user_model().objects.create_user('user',
+            'user@example.com', 'password')
+
+    def process(self, content):
+        link = create_link(Website, self.user, 1,
+            image=SimpleUploadedFile('image.jpg', content))
+        call_command('process_image_jobs', once=True, stdout=io.StringIO())
+        link.refresh_from_db()
+        return link
+
+    def test_image_info(self):
+        link = self.process(make_image('JPEG', (400, 300)))
+        self.assertEqual((link.image_width, link.image_height), (400, 300))
+        self.assertEqual(link.image_color[:3], '#fe')
+        self.assertTrue(link.image_placeholder.startswith(
+            'data:image/webp;base64,'))
+        entry = LinkIndex.objects.get()
+        self.assertEqual((entry.image_width, entry.image_height,
+            entry.image_color, entry.image_placeholder),
+            (400, 300, link.image_color, link.image_placeholder))
+
+    def test_rotated_images(self):
+        exif = Image.Exif()
+        exif[derivatives.EXIF_ORIENTATION] = 6
+        link = self.process(make_image('JPEG', (400, 300), exif=exif))
+        self.assertEqual((link.image_width, link.image_height), (300, 400))
+
+    def test_new_image_is_described_again(self):
+        link = self.process(make_image('JPEG', (400, 300)))
+        link.image = SimpleUploadedFile('other.jpg',
+            make_image('JPEG', (200, 100)))
+        link.save()
+        self.assertIsNone(link.image_width)
+        self.assertEqual(link.image_placeholder, '')
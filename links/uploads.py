@@ -0,0 +1,131 @@
+import io
+import struct
+import warnings
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.template.defaultfilters import filesizeformat
+from django.utils.translation import ugettext as _
+from PIL import Image
+
+
+MAX_BYTES = getattr(settings, 'LINKS_IMAGE_MAX_BYTES', 5 * 1024 * 1024)
+MAX_PIXELS = getattr(settings, 'LINKS_IMAGE_MAX_PIXELS', 24 * 1000 * 1000)
+FORMATS = getattr(settings, 'LINKS_IMAGE_FORMATS',
+    ('JPEG', 'PNG', 'GIF', 'WEBP'))
+# headers (with EXIF, ICC profiles, ...) are in the first bytes of files
+HEADER_BYTES = 256 * 1024
+
+
+def read_webp_header(data):
+    """
+    Return (width, height) of WebP image whose first bytes are `data`, from
+    its first chunk (VP8, VP8L or VP8X). None if more bytes are needed.
+    Pillow cannot open truncated WebP images, so they are parsed here.
+    """
+    if len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b'VP8 ':
+        # frame tag (3 bytes), start code and 14-bit dimensions
+        if data[23:26] != b'\x9d\x01\x2a':
+            return 0, 0
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3fff, height & 0x3fff
+    if chunk == b'VP8L':
+        # signature and 14-bit dimensions minus one
+        if data[20] != 0x2f:
+            return 0, 0
+        bits = struct.unpack('<I', data[21:25])[0]
+        return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+    if chunk == b'VP8X':
+        # flags and 24-bit canvas dimensions minus one
+        width = int.from_bytes(data[24:27], 'little') + 1
+        height = int.from_bytes(data[27:30], 'little') + 1
+        return width, height
+    return 0, 0
+
+
+def read_header(data):
+    """
+    Return (format, width, height) of image whose first bytes are `data`,
+    without decoding it. None if more bytes are needed.
+    """
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        size = read_webp_header(data)
+        if size is None:
+            return None
+        width, height = size
+        # unknown chunks are rejected as invalid images
+        return ('WEBP' if width and height else None), width, height
+
+    with warnings.catch_warnings():
+        # pixels are checked by `check_header`
+        warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+        try:
+            img = Image.open(io.BytesIO(data))
+        except Image.DecompressionBombError:
+            return None, float('inf'), 1
+        except (OSError, SyntaxError, ValueError):
+            return None
+    width, height = img.size
+    return img.format, width, height
+
+
+def check_header(format, width, height):
+    """Return error message if image is not allowed"""
+    if width * height > MAX_PIXELS:
+        return _('Image is too large, upload an image up to %d megapixels.') \
+            % (MAX_PIXELS // 10 ** 6)
+    if format not in FORMATS:
+        return _('Upload an image in one of these formats: %s.') % \
+            ', '.join(FORMATS)
+    return None
+
+
+class ImageUploadGuardHandler(FileUploadHandler):
+    """
+    Reject uploaded files that are too large or whose header is not of an
+    allowed image, as soon as the offending bytes arrive and before the
+    file is stored by the next handlers (memory or temporary file).
+
+    Rejected files are skipped and their errors are kept in
+    `request.rejected_uploads` by field name, views report them (see
+    `links.mixins.UploadGuardMixIn`).
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = b''
+        self.header_checked = False
+
+    def reject(self, message):
+        if not hasattr(self.request, 'rejected_uploads'):
+            self.request.rejected_uploads = {}
+        self.request.rejected_uploads[self.field_name] = message
+        raise SkipFile(message)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > MAX_BYTES:
+            self.reject(_('File is too large, upload a file up to %s.') %
+                filesizeformat(MAX_BYTES))
+
+        if not self.header_checked:
+            self.header += raw_data
+            header = read_header(self.header)
+            if header is not None:
+                self.header_checked = True
+                self.header = b''
+                message = check_header(*header)
+                if message:
+                    self.reject(message)
+            elif len(self.header) >= HEADER_BYTES:
+                self.reject(_('Upload a valid image.'))
+        return raw_data
+
+    def file_complete(self, file_size):
+        # file is made by the next handlers, and files that are not
+        # images are rejected by the image field
+        return None
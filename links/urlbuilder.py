@@ -0,0 +1,57 @@
+import re
+
+from django.urls import get_script_prefix, reverse
+from django.utils import translation
+
+
+# values that are never quoted by reverse() and match `slug` and `int`
+# path converters
+SAFE_VALUE = re.compile(r'[-a-zA-Z0-9_]+')
+PLACEHOLDER = 'url-builder-placeholder'
+
+
+class URLBuilder:
+    """
+    Build URLs of objects without walking the URL resolver for each one.
+
+    A view is reversed once per (view name, argument, language, script
+    prefix) with a placeholder value, later URLs are made by putting
+    values (eg. slugs) in place of the placeholder.
+    """
+
+    def __init__(self):
+        self.templates = {}
+
+    def get_template(self, view_name, kwarg, language):
+        key = (view_name, kwarg, language, get_script_prefix())
+        template = self.templates.get(key)
+        if template is None:
+            url = self.reverse(view_name, PLACEHOLDER, kwarg, language)
+            template = self.templates[key] = tuple(url.split(PLACEHOLDER))
+        return template
+
+    @staticmethod
+    def reverse(view_name, value, kwarg, language):
+        # override restores the active language afterwards
+        with translation.override(language):
+            if kwarg is None:
+                return reverse(view_name, args=(value,))
+            return reverse(view_name, kwargs={kwarg: value})
+
+    def build(self, view_name, value, kwarg=None, language=None):
+        """
+        Return URL of `view_name` for `value`, passed as keyword argument
+        `kwarg` or as the only positional argument.
+        `language` defaults to the active language.
+        """
+        if language is None:
+            language = translation.get_language()
+        value = str(value)
+        if not SAFE_VALUE.fullmatch(value):
+            # needs quoting or may not match the pattern
+            return self.reverse(view_name, value, kwarg, language)
+        prefix, suffix = self.get_template(view_name, kwarg, language)
+        return f'{prefix}{value}{suffix}'
+
+
+url_builder = URLBuilder()
@@ -4,12 +4,11 @@ import re
 
 from django.core.exceptions import ValidationError
 from django.utils.translation import ugettext_lazy as _
-from django.contrib.contenttypes.models import ContentType
 from django.utils.text import slugify
 from rest_framework.serializers import ValidationError as drf_ValidationError
-from PIL import Image
 from dashboard.models import Action
 from links import models
+from links.registry import content_types
 
 
 ### LINKS
@@ -207,16 +206,13 @@ def is_duplicate_url(object):
     return False # object not found (no duplicate object)
 
 
-def scale_image(image_path: str):
-    img = Image.open(image_path)
-    img.thumbnail((320, 240))
-    img.save(image_path)
-
-
-def create_thumbnail(image_path: str, thumbnail_path: str):
-    img = Image.open(image_path)
-    img.thumbnail((160, 120))
-    img.save(thumbnail_path)
+def remove_files(*paths):
+    """Remove files, missing files are ignored"""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
 
 
 def link_updated(object, data, fields):
@@ -232,17 +228,7 @@ def link_updated(object, data, fields):
 
 
 def create_or_update_action(object, type_of_action):
-    link_models = ['website', 'channel', 'group', 'instagram', 'report']
-    contact_models = ['contactus']
-
-    model_name = object.model_name
-    if model_name in link_models:
-        content_type = ContentType.objects.get(model=model_name,
-                                               app_label='links')
-    elif model_name in contact_models:
-        content_type = ContentType.objects.get(model=model_name,
-                                               app_label='contact')
-
+    content_type = content_types.get_content_type(object.model_name)
     action, created = Action.objects.get_or_create(
         type=type_of_action,
         content_type=content_type,
@@ -261,8 +247,10 @@ def validate_and_update_link(object, data):
     else:
         object_dup = deepcopy(object) # create a child
         object_dup.pk = None
-        object_dup.save()
+        # a draft child from the first save, so it is never indexed
         object_dup.parent = object
+        object_dup.status = 'draft'
+        object_dup.save()
 
     # Assign all values that are sent with form to child.
     # settings specific fields
@@ -311,9 +299,7 @@ def validate_and_update_link(object, data):
     category = data.get('category', object_dup.category)
     object_dup.category = category
 
-    # save old image and thumbnail path
-    old_dup_image_path = object_dup.image.path
-    old_dup_thumbnail_path = object_dup.thumbnail_path
+    # old image is released by `Link.save` if it changed
     object_dup.image = data.get('image', object_dup.image)
 
     # set tags
@@ -324,12 +310,6 @@ def validate_and_update_link(object, data):
     object_dup.save()
     create_or_update_action(object_dup, 'link updated')
 
-    # after saving child, if child images changed remove old ones
-    if object_dup.image.path != old_dup_image_path and \
-        object_dup.parent.image.path != old_dup_image_path:
-        os.remove(old_dup_image_path)
-        os.remove(old_dup_thumbnail_path)
-
     return True
 
 
@@ -343,24 +323,6 @@ def get_parent_or_child_object(object):
     return obj
 
 
-def delete_images(object):
-    """Delete image and thumbnail files"""
-    try:
-        # remove image and thumbnail
-        os.remove(object.image.path)
-        os.remove(object.thumbnail_path)
-
-        # if object has child remove child's image and thumbnail too
-        child = object.child
-        if child:
-            os.remove(child.image.path)
-            os.remove(child.thumbnail_path)
-    except FileNotFoundError:
-        # this exception onlly happens when parent and child both point to the
-        # same image, thumbnail files. we simply just ignore it.
-        pass
-
-
 def hide_action(action):
     """Hide an object's action by make `is_read` attr set to True"""
     action.is_read = True
@@ -1,16 +1,18 @@
-from itertools import chain
 from urllib.parse import unquote
 
-from django.http import HttpResponseForbidden
-from django.db.models import Q
+from django.http import HttpResponseForbidden, Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
-from django.contrib.contenttypes.models import ContentType
 from django.utils.translation import ugettext_lazy as _
 from django.contrib import messages
 from taggit.models import Tag
 from django.core.exceptions import PermissionDenied
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.core.paginator import (
+    Paginator,
+    Page,
+    EmptyPage,
+    PageNotAnInteger,
+)
 from django.views.generic import (
     ListView,
     DetailView,
@@ -30,6 +32,7 @@ from .models import (
     Group,
     Instagram,
     Report,
+    LinkIndex,
 )
 
 from .mixins import (
@@ -57,21 +60,28 @@ from .forms import (
 )
 
 from . import utils
+from .registry import content_types
+from .cache import get_or_compute
+from .search import search as search_links
+from .search import fuzzy_search as fuzzy_search_links
+
+
+def get_latest_links():
+    return {
+        'websites': list(Website.published.all()[:6]),
+        'channels': list(Channel.published.all()[:6]),
+        'groups': list(Group.published.all()[:6]),
+        'instagrams': list(Instagram.published.all()[:6]),
+    }
 
 
 # list all links: websites, channels, groups, and instagrams
 def index(request):
-    websites = Website.published.all()[:6]
-    channels = Channel.published.all()[:6]
-    groups = Group.published.all()[:6]
-    instagrams = Instagram.published.all()[:6]
-
+    # refreshed when a link is published, updated, unpublished or deleted
+    links = get_or_compute('index', get_latest_links)
     context = {
-        'websites': websites,
-        'channels': channels,
-        'groups': groups,
-        'instagrams': instagrams,
         'active_home': True,
+        **links,
     }
     return render(request, 'links/index.html', context)
 
@@ -299,9 +309,10 @@ class InstagramDeleteView(DeleteMixIn):
 
 @ratelimit(key='ip', rate='5/m')
 def report_link(request, model_name, slug):
-    # app_label is required to not conflict with other models
-    content_type = ContentType.objects.get(model=model_name, app_label='links')
-    model = content_type.model_class()
+    try:
+        model = content_types.get_link_model(model_name)
+    except LookupError:
+        raise Http404
     obj = model.published.filter(slug=slug).first()
 
     # if object not exists or not published raise 403 error
@@ -352,12 +363,7 @@ def tagged_items(request, tag_slug):
     """
     tag_slug = unquote(tag_slug)
     tag = get_object_or_404(Tag, slug=tag_slug)
-    websites = Website.published.filter(tags__in=[tag])
-    channels = Channel.published.filter(tags__in=[tag])
-    groups = Group.published.filter(tags__in=[tag])
-    instagrams = Instagram.published.filter(tags__in=[tag])
-
-    object_list = list(chain(websites, channels, groups, instagrams))
+    object_list = LinkIndex.objects.filter(tags=tag)
 
     # 20 links per page
     paginator = Paginator(object_list, utils.MAX_PAGE_LIMIT)
@@ -379,18 +385,15 @@ def tagged_items(request, tag_slug):
 
 def search(request):
     q = request.GET.get('q')
-    if q:
-        query = (Q(title__icontains=q) | Q(description__icontains=q))
-
-        # search the query in published links
-        object_list = list(chain(
-            Website.published.filter(query),
-            Channel.published.filter(query),
-            Group.published.filter(query),
-            Instagram.published.filter(query))
-        )
+    fuzzy = request.GET.get('fuzzy')
+    if q and fuzzy:
+        # typo-tolerant search, most similar links first
+        object_list = fuzzy_search_links(q)
+    elif q:
+        # search the query in published links, best matches first
+        object_list = search_links(q)
     else:
-        object_list = None
+        object_list = LinkIndex.objects.none()
 
     # 20 links per page
     paginator = Paginator(object_list, utils.MAX_PAGE_LIMIT)
@@ -402,33 +405,34 @@ def search(request):
     except EmptyPage:
         object_list = paginator.page(paginator.num_pages)
 
+    query_string = f'&q={q}'
+    if fuzzy:
+        query_string += '&fuzzy=1'
+
     context = {
         'is_paginated': True,
         'page_obj': object_list,
-        'query_string': f'&q={q}', # search query
+        'query_string': query_string, # search query
     }
     return render(request, 'links/search.html', context)
 
 
 class CategoriesListView(ListView):
     model = Category
+    # queryset is cached as a list, template name can't be guessed
+    template_name = 'links/category_list.html'
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return get_or_compute('categories', lambda: list(queryset))
 
-def categorized_items(request, category_id):
-    """
-    list all links that are categorized as category_id[name]
-    """
-    category = get_object_or_404(Category, pk=category_id)
-    websites = Website.published.filter(category_id=category_id)
-    channels = Channel.published.filter(category_id=category_id)
-    groups = Group.published.filter(category_id=category_id)
-    instagrams = Instagram.published.filter(category_id=category_id)
 
-    object_list = list(chain(websites, channels, groups, instagrams))
+def get_categorized_page(category_id, page):
+    category = get_object_or_404(Category, pk=category_id)
+    object_list = LinkIndex.objects.filter(category=category)
 
     # 20 links per page
     paginator = Paginator(object_list, utils.MAX_PAGE_LIMIT)
-    page = request.GET.get('page')
     try:
         object_list = paginator.page(page)
     except PageNotAnInteger:
@@ -436,9 +440,45 @@ def categorized_items(request, category_id):
     except EmptyPage:
         object_list = paginator.page(paginator.num_pages)
 
+    return {
+        'category': category,
+        'count': paginator.count,
+        'number': object_list.number,
+        'links': list(object_list),
+    }
+
+
+def get_category_count(category_id):
+    category = get_object_or_404(Category, pk=category_id)
+    return LinkIndex.objects.filter(category=category).count()
+
+
+def categorized_items(request, category_id):
+    """
+    list all links that are categorized as category_id[name]
+    """
+    # page is clamped to existing pages before it is part of cache keys,
+    # so any number of page numbers cache one entry per existing page
+    paginator = Paginator([], utils.MAX_PAGE_LIMIT)
+    paginator.count = get_or_compute('category-count',
+        lambda: get_category_count(category_id), category_id)
+    try:
+        page = paginator.validate_number(request.GET.get('page') or 1)
+    except PageNotAnInteger:
+        page = 1
+    except EmptyPage:
+        page = paginator.num_pages
+    result = get_or_compute('categorized-items',
+        lambda: get_categorized_page(category_id, page), category_id, page)
+
+    # rebuild the page from cached links, without counting them again
+    paginator = Paginator([], utils.MAX_PAGE_LIMIT)
+    paginator.count = result['count']
+    object_list = Page(result['links'], result['number'], paginator)
+
     context = {
         'is_paginated': True,
         'page_obj': object_list,
-        'category': category,
+        'category': result['category'],
     }
     return render(request, 'links/categorized_items.html', context)
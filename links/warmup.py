@@ -0,0 +1,162 @@
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote_to_bytes, urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.handlers.exception import response_for_exception
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection
+from django.db.models import Count
+from django.urls import NoReverseMatch, resolve, reverse
+from django.utils import translation
+from taggit.models import Tag
+
+from links import models
+
+
+# url names of pages that are always warmed up
+HOT_PAGES = getattr(settings, 'LINKS_HOT_PAGES', [
+    'links:index',
+    'links:categories',
+    'links:websites',
+    'links:channels',
+    'links:groups',
+    'links:instagrams',
+    'links-apis:index',
+])
+# number of categories and tags (with most links) that are warmed up
+TOP = getattr(settings, 'LINKS_WARM_TOP', 10)
+WORKERS = getattr(settings, 'LINKS_WARM_WORKERS', 4)
+# seconds to wait after a catalogue change before warming up, so a burst
+# of changes (eg. publishing in admin) is warmed once, `None` disables it
+ON_CHANGE_DELAY = getattr(settings, 'LINKS_WARM_ON_CHANGE_DELAY', None)
+SCHEDULED_KEY = 'links:warm-up-scheduled'
+
+
+def get_hot_pages(top=TOP):
+    """
+    Return (url name, kwargs) of hot pages: configured pages, and pages
+    of categories and tags with most links.
+    """
+    pages = [(name, {}) for name in HOT_PAGES]
+
+    categories = (models.LinkIndex.objects
+        .exclude(category=None)
+        .values_list('category')
+        .annotate(count=Count('id'))
+        .order_by('-count')[:top])
+    for category_id, count in categories:
+        pages.append(('links:categorized_items', {'category_id': category_id}))
+
+    tag_ids = (models.LinkIndex.tags.through.objects
+        .values_list('tag')
+        .annotate(count=Count('id'))
+        .order_by('-count')[:top])
+    # tags whose names have no latin letters or digits have empty slugs
+    tags = Tag.objects.filter(
+        pk__in=[tag_id for tag_id, count in tag_ids]).exclude(slug='')
+    for slug in tags.values_list('slug', flat=True):
+        pages.append(('links:tagged_items', {'tag_slug': slug}))
+    return pages
+
+
+def get_hot_paths(top=TOP):
+    """Paths of hot pages in all languages"""
+    pages = get_hot_pages(top)
+    paths = []
+    for language, name in settings.LANGUAGES:
+        with translation.override(language):
+            for view_name, kwargs in pages:
+                try:
+                    paths.append(reverse(view_name, kwargs=kwargs))
+                except NoReverseMatch:
+                    # eg. a slug with characters that urls do not accept
+                    continue
+    return paths
+
+
+def make_request(path, host, secure=True):
+    """GET request of `path` (with its query string) to `host`"""
+    url = urlsplit(path)
+    return WSGIRequest({
+        'REQUEST_METHOD': 'GET',
+        # WSGI servers pass the unquoted path as latin-1
+        'PATH_INFO': unquote_to_bytes(url.path).decode('iso-8859-1'),
+        'QUERY_STRING': url.query,
+        'SCRIPT_NAME': '',
+        'HTTP_HOST': host,
+        'SERVER_NAME': host,
+        'SERVER_PORT': '443' if secure else '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.url_scheme': 'https' if secure else 'http',
+        'wsgi.input': io.BytesIO(),
+    })
+
+
+def render_path(path, host, secure=True):
+    """
+    Render the view of `path` for an anonymous user, in the language of
+    its prefix, and return the response.
+    """
+    request = make_request(path, host, secure)
+    request.user = AnonymousUser()
+    language = (translation.get_language_from_path(request.path_info) or
+        settings.LANGUAGE_CODE)
+    with translation.override(language):
+        request.LANGUAGE_CODE = language
+        try:
+            match = resolve(request.path_info)
+            request.resolver_match = match
+            response = match.func(request, *match.args, **match.kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+        except Exception as exc:
+            response = response_for_exception(request, exc)
+    return response
+
+
+def warm_up(paths, workers=WORKERS, host=None, secure=True):
+    """
+    Render views of `paths` concurrently so their cached data and fragments
+    are computed, return (path, status code, seconds) of each path.
+    Views are called directly, without the request handler and middleware.
+    """
+    if host is None:
+        host = settings.ALLOWED_HOSTS[0]
+
+    def get(path):
+        start = time.perf_counter()
+        try:
+            response = render_path(path, host, secure)
+        finally:
+            connection.close()
+        return path, response.status_code, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(get, paths))
+
+
+def schedule_warm_up():
+    """
+    Warm up hot pages in a background thread ON_CHANGE_DELAY seconds later,
+    unless a warm up is already scheduled.
+    """
+    if ON_CHANGE_DELAY is None:
+        return
+    if not cache.add(SCHEDULED_KEY, True, ON_CHANGE_DELAY):
+        return
+
+    def run():
+        try:
+            warm_up(get_hot_paths())
+        finally:
+            connection.close()
+
+    timer = threading.Timer(ON_CHANGE_DELAY, run)
+    timer.daemon = True
+    timer.start()